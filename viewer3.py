@@ -11,35 +11,1335 @@ Améliorations:
 import numpy as np
 import zarr
 import json
+import os
+import bisect
+import hashlib
+import io
+import heapq
+import itertools
+import shutil
+import sqlite3
+import struct
+import threading
+import time
+import zipfile
 from pathlib import Path
 import tkinter as tk
 from tkinter import filedialog, ttk, messagebox
 from PIL import Image, ImageTk, ImageDraw
 from collections import OrderedDict
+from collections.abc import MutableMapping
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    # API interne de zarr 3: tableau construit depuis des métadonnées mises en cache
+    from zarr.core.array import AsyncArray
+    from zarr.core.buffer import default_buffer_prototype
+except ImportError:
+    AsyncArray = default_buffer_prototype = None
+
+# zarr 3 ou zarr 2: les options d'ouverture (format, métadonnées consolidées) diffèrent
+ZARR_V3 = int(zarr.__version__.split(".")[0]) >= 3
+# ZipStore de zarr 3.x: son ZipFile (attributs internes _zf, _lock, _is_open) peut être fourni
+ZIP_STORE_SHARABLE = int(zarr.__version__.split(".")[0]) == 3
+
+
+# Grille de tuiles: taille alignée sur les chunks zarr, bornée pour garder des lectures raisonnables
+TILE_MIN_SIZE = 256
+TILE_MAX_SIZE = 1024
+
+
+def _env_int(name, default):
+    """Lit un entier dans une variable d'environnement (valeur par défaut si absente ou invalide)"""
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+# Budget mémoire du cache de tuiles (Mo), réglable par poste via OMEZARR_TILE_CACHE_MB
+TILE_CACHE_MB = _env_int("OMEZARR_TILE_CACHE_MB", 512)
+
+# Budget mémoire du cache des calques d'annotations rastérisés (Mo), via OMEZARR_OVERLAY_CACHE_MB
+OVERLAY_CACHE_MB = _env_int("OMEZARR_OVERLAY_CACHE_MB", 128)
+# Taille comptée pour une tuile sans annotation dans ce cache (ordre de grandeur de la clé et de l'entrée)
+EMPTY_OVERLAY_BYTES = 256
+
+# Dossier de cache local (vignettes, ...), réglable via OMEZARR_CACHE_DIR
+CACHE_DIR = Path(os.environ.get("OMEZARR_CACHE_DIR")
+                 or Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "omezarr_viewer")
+
+# Nombre de threads de lecture des tuiles en arrière-plan
+TILE_LOADER_WORKERS = _env_int("OMEZARR_TILE_WORKERS", 4)
+
+# Fréquence maximale de rendu (les événements plus rapprochés sont regroupés)
+MAX_FPS = _env_int("OMEZARR_MAX_FPS", 60)
+
+# Nombre de threads de génération des vignettes (borné pour ne pas saturer disque et GIL)
+THUMBNAIL_WORKERS = _env_int("OMEZARR_THUMB_WORKERS", 2)
+
+# Budget de lecture (Mo de chunks décodés) pour une vignette d'un niveau encore très grand
+THUMBNAIL_READ_MB = _env_int("OMEZARR_THUMB_READ_MB", 32)
+
+# Préchargement: anticipation du déplacement (s) et part du budget cache utilisable par rendu
+PREFETCH_LOOKAHEAD = 0.3
+PREFETCH_BUDGET_FRACTION = 0.25
+# Nombre max de tuiles préchargées suivies pour le taux d'utilisation (les plus anciennes sont oubliées)
+PREFETCH_MAX_KEYS = 4096
+
+# Zoom continu: facteur par cran de molette et zoom max (1.0 = pleine résolution du niveau 0)
+ZOOM_STEP = 1.25
+MAX_ZOOM = 2.0
+
+# Taille max (Mo) du niveau le plus bas gardé résident pour l'affichage progressif
+OVERVIEW_MAX_MB = _env_int("OMEZARR_OVERVIEW_MAX_MB", 64)
+
+# Mémoire max (Mo) des PhotoImage réutilisables conservés, toutes tailles confondues
+PHOTO_POOL_MB = _env_int("OMEZARR_PHOTO_POOL_MB", 32)
+
+# Simplification des annotations par niveau: taille (px du niveau) sous laquelle une annotation
+# devient un point
+ANNOTATION_DOT_PX = 2
+
+# Carte de densité des annotations en vue dézoomée: utilisée à partir d'un sous-échantillonnage
+# du niveau (OMEZARR_HEATMAP_MIN_DOWNSAMPLE) et d'un nombre d'annotations (OMEZARR_HEATMAP_MIN_FEATURES);
+# taille d'une case de la grille en pixels du niveau
+HEATMAP_MIN_DOWNSAMPLE = _env_int("OMEZARR_HEATMAP_MIN_DOWNSAMPLE", 16)
+HEATMAP_MIN_FEATURES = _env_int("OMEZARR_HEATMAP_MIN_FEATURES", 20000)
+HEATMAP_BIN_PX = 8
+
+# Chargement des annotations en flux: taille des blocs lus, premier lot compilé (doublé à chaque
+# lot jusqu'au maximum) et intervalle entre les deux premières mises à jour de l'affichage (s),
+# doublé ensuite à chaque mise à jour: chacune invalide les niveaux simplifiés et cartes de densité
+GEOJSON_CHUNK_SIZE = 1 << 20
+ANNOTATION_BATCH_MIN = 2000
+ANNOTATION_BATCH_MAX = 100000
+ANNOTATION_PUBLISH_INTERVAL = 0.5
+
+# Version du format des sidecars d'annotations compilées (CACHE_DIR/annotations)
+ANNOTATION_SIDECAR_VERSION = 1
+
+# Version du format des dispositions de lames mises en cache (CACHE_DIR/layouts)
+LAYOUT_CACHE_VERSION = 1
+
+# Nombre d'index d'archives ZIP gardés ouverts (table centrale analysée une seule fois)
+ZIP_INDEX_CACHE_SIZE = 16
+
+# Scan des dossiers: profondeur (1 = dossier racine seul, 2 = racine + sous-dossiers directs),
+# nombre de listages de dossiers en parallèle (utile sur partage réseau)
+SCAN_DEPTH = _env_int("OMEZARR_SCAN_DEPTH", 2)
+SCAN_WORKERS = _env_int("OMEZARR_SCAN_WORKERS", 8)
+# Période du rescan incrémental automatique du dossier racine, en secondes (0 = désactivé)
+FOLDER_POLL_SECONDS = _env_int("OMEZARR_FOLDER_POLL_S", 10)
+
+# Priorités du chargeur (plus petit = plus urgent)
+PRIORITY_VISIBLE = 0
+PRIORITY_PREFETCH_PAN = 1
+PRIORITY_PREFETCH_ZOOM = 2
+
+
+def _slide_signature(path):
+    """Retourne (taille, mtime_ns) identifiant l'état d'une lame sans l'ouvrir.
+    
+    Pour un dossier zarr, la date du dossier est complétée par celle de ses métadonnées racine
+    (réécrites par le convertisseur), qui ne changent pas la date du dossier lui-même.
+    """
+    p = Path(path)
+    st = p.stat()
+    if not p.is_dir():
+        return st.st_size, st.st_mtime_ns
+    mtime = st.st_mtime_ns
+    for marker in ('zarr.json', '.zattrs', '.zgroup'):
+        try:
+            mtime = max(mtime, (p / marker).stat().st_mtime_ns)
+        except OSError:
+            continue
+    return 0, mtime
 
 
 class TileCache:
-    """Cache LRU simple pour les tuiles"""
-    def __init__(self, max_size=50):
-        self.cache = OrderedDict()
-        self.max_size = max_size
-    
-    def get(self, key):
-        if key in self.cache:
-            self.cache.move_to_end(key)
-            return self.cache[key]
-        return None
+    """Cache LRU pour les tuiles, borné en octets (ndarray.nbytes), avec statistiques.
+    
+    Les clés sont des tuples (chemin, niveau, ...) : le niveau sert à la répartition par niveau.
+    """
+    def __init__(self, max_bytes=TILE_CACHE_MB * 1024 * 1024):
+        self.cache = OrderedDict()  # {key: value}
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.level_bytes = {}  # {niveau: octets résidents}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()  # Accès depuis les threads de chargement
+    
+    @staticmethod
+    def _level_of(key):
+        return key[1] if isinstance(key, tuple) and len(key) > 1 else None
+    
+    def _remove(self, key):
+        value = self.cache.pop(key)
+        nbytes = getattr(value, 'nbytes', 0)
+        level = self._level_of(key)
+        self.bytes -= nbytes
+        self.level_bytes[level] -= nbytes
+        if self.level_bytes[level] <= 0:
+            del self.level_bytes[level]
+    
+    def get(self, key, record_stats=True):
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                if record_stats:
+                    self.hits += 1
+                return self.cache[key]
+            if record_stats:
+                self.misses += 1
+            return None
+    
+    def __contains__(self, key):
+        """Test de présence sans compter de hit/miss ni toucher à l'ordre LRU"""
+        with self.lock:
+            return key in self.cache
     
     def put(self, key, value):
-        if key in self.cache:
-            self.cache.move_to_end(key)
-        else:
-            if len(self.cache) >= self.max_size:
-                self.cache.popitem(last=False)
+        nbytes = getattr(value, 'nbytes', 0)
+        if nbytes > self.max_bytes:
+            return  # Plus gros que le budget entier: non mis en cache
+        
+        with self.lock:
+            if key in self.cache:
+                self._remove(key)
+            
+            # Évince les entrées les plus anciennes jusqu'à respecter le budget
+            while self.cache and self.bytes + nbytes > self.max_bytes:
+                self._remove(next(iter(self.cache)))
+                self.evictions += 1
+            
             self.cache[key] = value
+            level = self._level_of(key)
+            self.bytes += nbytes
+            self.level_bytes[level] = self.level_bytes.get(level, 0) + nbytes
     
     def clear(self):
-        self.cache.clear()
+        with self.lock:
+            self.cache.clear()
+            self.bytes = 0
+            self.level_bytes = {}
+    
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def stats(self):
+        """Retourne les compteurs du cache (dict)"""
+        with self.lock:
+            level_bytes = dict(self.level_bytes)
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self.cache),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "level_bytes": dict(sorted(level_bytes.items(), key=lambda kv: (kv[0] is None, kv[0]))),
+        }
+    
+    def summary(self):
+        """Résumé court des statistiques pour la barre de statut"""
+        st = self.stats()
+        return (f"Cache: {st['bytes'] / 2**20:.0f}/{st['max_bytes'] / 2**20:.0f} Mo"
+                f" | {st['hit_rate']:.0%} hits | {st['evictions']} évict.")
+
+
+class BackgroundLoader:
+    """Pool de threads avec file de priorité pour les lectures en arrière-plan.
+    
+    Chaque tâche est identifiée par une clé : une tâche déjà en attente n'est pas dupliquée,
+    seules sa priorité et sa génération sont mises à jour. Les tâches soumises avec une
+    génération antérieure à la génération courante (vue déjà quittée) sont abandonnées.
+    """
+    def __init__(self, num_workers=4):
+        self.num_workers = num_workers
+        self.cond = threading.Condition()
+        self.heap = []  # [(priority, seq, key)]
+        self.pending = {}  # {key: {"priority", "seq", "generation", "func", "callback"}}
+        self.running = set()
+        self.generation = 0
+        self.seq = itertools.count()
+        self.workers = []
+    
+    def _ensure_workers(self):
+        while len(self.workers) < self.num_workers:
+            worker = threading.Thread(target=self._worker, daemon=True)
+            worker.start()
+            self.workers.append(worker)
+    
+    def new_generation(self):
+        """Démarre une nouvelle génération: les tâches non re-soumises deviennent obsolètes"""
+        with self.cond:
+            self.generation += 1
+            return self.generation
+    
+    def submit(self, key, func, callback=None, priority=0, generation=None):
+        """Soumet func() ; callback(key, result, error) est appelé dans le thread de travail.
+        
+        generation=None : la tâche n'est jamais considérée comme obsolète.
+        Une tâche déjà en attente dans la même génération garde sa meilleure priorité.
+        Retourne True si la tâche n'était ni en attente ni en cours.
+        """
+        with self.cond:
+            if key in self.running:
+                return False
+            entry = self.pending.get(key)
+            if entry is not None and entry["generation"] == generation and entry["priority"] <= priority:
+                return False
+            
+            seq = next(self.seq)
+            self.pending[key] = {"priority": priority, "seq": seq, "generation": generation,
+                                 "func": func, "callback": callback}
+            heapq.heappush(self.heap, (priority, seq, key))
+            self._ensure_workers()
+            self.cond.notify()
+            return entry is None
+    
+    def is_pending(self, key):
+        with self.cond:
+            return key in self.pending or key in self.running
+    
+    def cancel(self, key):
+        """Annule une tâche en attente (sans effet si elle est déjà en cours)"""
+        with self.cond:
+            self.pending.pop(key, None)
+    
+    def clear(self):
+        """Annule toutes les tâches en attente"""
+        with self.cond:
+            self.pending.clear()
+            self.heap.clear()
+    
+    def _next_task(self):
+        """Retire la tâche la plus prioritaire encore valide (appelé sous verrou)"""
+        while self.heap:
+            priority, seq, key = heapq.heappop(self.heap)
+            entry = self.pending.get(key)
+            if entry is None or entry["seq"] != seq:
+                continue  # Annulée ou remplacée par une soumission plus récente
+            del self.pending[key]
+            if entry["generation"] is not None and entry["generation"] < self.generation:
+                continue  # Obsolète: la vue a changé depuis la demande
+            self.running.add(key)
+            return key, entry
+        return None
+    
+    def _worker(self):
+        while True:
+            with self.cond:
+                task = self._next_task()
+                while task is None:
+                    self.cond.wait()
+                    task = self._next_task()
+            
+            key, entry = task
+            result, error = None, None
+            try:
+                result = entry["func"]()
+            except Exception as e:
+                error = e
+            
+            with self.cond:
+                self.running.discard(key)
+            
+            if entry["callback"] is not None:
+                try:
+                    entry["callback"](key, result, error)
+                except Exception as e:
+                    print(f"Erreur callback chargement {key}: {e}")
+
+
+def _list_dir(path):
+    """Liste un dossier via os.scandir: [(nom, est_dossier, est_fichier)] (type lu dans le dirent)"""
+    with os.scandir(path) as it:
+        return [(entry.name, entry.is_dir(), entry.is_file()) for entry in it]
+
+
+def _list_dir_cached(path, previous):
+    """Retourne (mtime_ns, listage) d'un dossier.
+    
+    Le listage précédent (previous: {chemin: (mtime_ns, listage)}) est réutilisé si la date du
+    dossier n'a pas changé: un rescan ne coûte alors qu'un stat par dossier.
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = previous.get(path)
+    if cached is not None and cached[0] == mtime:
+        return cached
+    return mtime, _list_dir(path)
+
+
+def _zip_central_directory(f, file_size):
+    """Retourne (offset, taille) de la table centrale d'une archive ouverte, ou None.
+    
+    Seule la fin du fichier est lue: enregistrement de fin (EOCD, 22 octets + commentaire
+    éventuel), puis, pour une archive zip64, l'enregistrement de fin zip64 qu'il désigne.
+    """
+    tail_size = min(file_size, 22 + 0xFFFF)  # EOCD + commentaire de taille maximale
+    f.seek(file_size - tail_size)
+    tail = f.read(tail_size)
+    pos = tail.rfind(b'PK\x05\x06')
+    if pos < 0 or len(tail) - pos < 22:
+        return None
+    cd_size, cd_offset = struct.unpack_from('<II', tail, pos + 12)
+    if cd_size == 0xFFFFFFFF or cd_offset == 0xFFFFFFFF:
+        # Zip64: localisateur (20 octets) juste avant l'EOCD
+        locator = pos - 20
+        if locator < 0 or tail[locator:locator + 4] != b'PK\x06\x07':
+            return None
+        eocd64_offset, = struct.unpack_from('<Q', tail, locator + 8)
+        f.seek(eocd64_offset)
+        record = f.read(56)
+        if len(record) < 56 or record[:4] != b'PK\x06\x06':
+            return None
+        cd_size, cd_offset = struct.unpack_from('<QQ', record, 40)
+    return cd_offset, cd_size
+
+
+_ZARR_MARKERS = (b'zarr.json', b'.zgroup', b'.zattrs')
+
+
+def _zip_has_zarr_markers(path, block_size=1 << 20):
+    """Vérifie le contenu d'une archive: True si une entrée zarr.json, .zgroup ou .zattrs existe.
+    
+    Seules la fin de l'archive et sa table centrale sont lues (par blocs, arrêt au premier
+    marqueur): le nom de l'archive n'intervient pas.
+    """
+    with open(path, 'rb') as f:
+        located = _zip_central_directory(f, os.fstat(f.fileno()).st_size)
+        if located is None:
+            return False
+        offset, remaining = located
+        f.seek(offset)
+        buf, pos = b'', 0
+        
+        def need(n):
+            """Garantit n octets disponibles à partir de pos (lecture du bloc suivant au besoin)"""
+            nonlocal buf, pos, remaining
+            if pos > len(buf):
+                # Champs extra/commentaire sautés au-delà du tampon
+                f.seek(pos - len(buf), os.SEEK_CUR)
+                remaining -= pos - len(buf)
+                buf, pos = b'', 0
+            while len(buf) - pos < n:
+                chunk = f.read(min(block_size, remaining)) if remaining > 0 else b''
+                if not chunk:
+                    return False
+                remaining -= len(chunk)
+                buf, pos = buf[pos:] + chunk, 0
+            return True
+        
+        # Entrées de la table centrale: en-tête fixe de 46 octets puis nom, extra, commentaire
+        while need(46):
+            if buf[pos:pos + 4] != b'PK\x01\x02':
+                return False
+            name_len, extra_len, comment_len = struct.unpack_from('<HHH', buf, pos + 28)
+            if not need(46 + name_len):
+                return False
+            name = buf[pos + 46:pos + 46 + name_len]
+            if any(name == marker or name.endswith(b'/' + marker) for marker in _ZARR_MARKERS):
+                return True
+            pos += 46 + name_len + extra_len + comment_len
+    return False
+
+
+def _probe_zarr_zip(path, known):
+    """Retourne ((taille, mtime_ns), contient un zarr) pour une archive.
+    
+    Le résultat connu (known: {chemin: (signature, résultat)}) est réutilisé tant que taille et
+    date sont inchangées: un rescan ne coûte qu'un stat par archive.
+    """
+    st = os.stat(path)
+    signature = (st.st_size, st.st_mtime_ns)
+    cached = known.get(path)
+    if cached is not None and cached[0] == signature:
+        return cached
+    try:
+        return signature, _zip_has_zarr_markers(path)
+    except (OSError, struct.error) as e:
+        print(f"ZIP illisible {path}: {e}")
+        return signature, False
+
+
+def _is_ome_zarr_listing(name, entries):
+    """Vérifie, d'après le listage d'un dossier, si c'est un OME-Zarr valide (v2 ou v3)"""
+    names = {entry_name for entry_name, _, _ in entries}
+    has_level0 = any(entry_name == '0' and is_dir for entry_name, is_dir, _ in entries)
+    
+    # Zarr v3 (zarr.json à la racine) avec au moins un niveau pyramidal (dossier "0")
+    if 'zarr.json' in names and has_level0:
+        return True
+    # Zarr v2 (.zgroup ou .zattrs)
+    if ('.zgroup' in names or '.zattrs' in names) and (has_level0 or '.zarray' in names):
+        return True
+    # Dossier .zarr/.ome.zarr avec sous-dossiers numériques
+    return '.zarr' in name and has_level0
+
+
+def _is_mrxs_folder(name, parent_names):
+    """Détecte les dossiers MRXS à ignorer (contiennent des milliers de tuiles).
+    
+    parent_names: noms du dossier parent (le fichier .mrxs associé y est cherché sans stat).
+    """
+    return name.lower().endswith('.mrxs') or f"{name}.mrxs" in parent_names
+
+
+_ZARR_METADATA_NAMES = {'zarr.json', '.zattrs', '.zgroup', '.zarray', '.zmetadata'}
+
+
+def _is_annotation_entry(name):
+    """Vrai pour une entrée de ZIP contenant des annotations (GeoJSON)"""
+    return name.endswith('.geojson') or (name.endswith('.json') and 'annot' in name.lower())
+
+
+def _open_consolidated_v2(store):
+    """zarr 2: ouvre via les métadonnées consolidées (.zmetadata) si présentes, sinon zarr.open"""
+    try:
+        return zarr.open_consolidated(store, mode='r')
+    except KeyError:
+        return zarr.open(store, mode='r')
+
+
+class _ZipEntries(MutableMapping):
+    """Store zarr 2 en lecture seule sur un ZipFile déjà ouvert (zarr 2 accepte tout mapping).
+    
+    root: dossier du zarr dans l'archive; les clés sont relatives à ce dossier, comme celles d'un
+    .zmetadata consolidé dans le dossier avant sa mise en archive.
+    """
+    def __init__(self, zf, root=""):
+        self.zf = zf
+        self.prefix = f"{root}/" if root else ""
+    
+    def __getitem__(self, key):
+        return self.zf.read(self.prefix + key)  # KeyError si l'entrée n'existe pas
+    
+    def __contains__(self, key):
+        return self.prefix + key in self.zf.NameToInfo
+    
+    def __iter__(self):
+        n = len(self.prefix)
+        return (name[n:] for name, info in self.zf.NameToInfo.items()
+                if name.startswith(self.prefix) and not info.is_dir())
+    
+    def __len__(self):
+        return sum(1 for _ in self)
+    
+    def __setitem__(self, key, value):
+        raise PermissionError("archive ZIP ouverte en lecture seule")
+    
+    def __delitem__(self, key):
+        raise PermissionError("archive ZIP ouverte en lecture seule")
+
+
+class ZipArchiveIndex:
+    """Index d'une archive .zarr.zip: table centrale lue une fois, racine zarr, entrées d'annotations.
+    
+    Le ZipFile reste ouvert et est partagé par le store zarr (lecture de l'image et des vignettes)
+    et par la lecture des annotations: une archive de centaines de milliers d'entrées n'est
+    analysée qu'une fois par (chemin, taille, date). Obtenir les index via _get_zip_index().
+    """
+    def __init__(self, path):
+        self.path = str(path)
+        self.zf = zipfile.ZipFile(self.path, 'r')
+        self.root = self._find_root(list(self.zf.NameToInfo))
+        self.annotation_entries = [info for name, info in self.zf.NameToInfo.items() if _is_annotation_entry(name)]
+        self._store = None
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _find_root(names):
+        """Chemin racine du zarr dans l'archive ('' si à la racine)"""
+        # Dossier le moins profond contenant zarr.json, .zgroup ou .zattrs (nom exact, comme à la détection)
+        markers = {marker.decode() for marker in _ZARR_MARKERS}
+        roots = [parts[:-1] for parts in (name.replace('\\', '/').split('/') for name in names)
+                 if parts[-1] in markers]
+        if roots:
+            return '/'.join(min(roots, key=len))
+        
+        # Si pas trouvé, chercher un dossier "0" (niveau pyramidal)
+        for name in names:
+            parts = name.replace('\\', '/').split('/')
+            if '0' in parts:
+                return '/'.join(parts[:parts.index('0')])
+        return ""
+    
+    @property
+    def store(self):
+        """Store zarr (lecture seule) partageant le ZipFile déjà ouvert.
+        
+        zarr 3 ouvre son ZipStore au premier accès (_sync_open): le ZipFile de l'index est installé
+        à sa place (attributs internes vérifiés sur les versions 3.x; sinon ZipStore ordinaire, qui
+        relit la table centrale). zarr 2 ouvrirait l'archive dès la construction du ZipStore: il
+        reçoit à la place un mapping sur le ZipFile de l'index (_ZipEntries), enraciné au dossier du zarr.
+        """
+        with self._lock:
+            if self._store is None:
+                if not ZARR_V3:
+                    self._store = _ZipEntries(self.zf, self.root)
+                    return self._store
+                store = zarr.storage.ZipStore(self.path, mode='r')
+                if ZIP_STORE_SHARABLE and hasattr(store, "_sync_open") and getattr(store, "_is_open", True) is False:
+                    store._lock = threading.RLock()
+                    store._zf = self.zf
+                    store._is_open = True
+                self._store = store
+            return self._store
+    
+    def open_group(self, **kwargs):
+        """Ouvre le groupe zarr racine de l'archive (kwargs: options de zarr.open_group, zarr 3 seulement)"""
+        if not ZARR_V3:
+            return _open_consolidated_v2(self.store)
+        if self.root or kwargs:
+            return zarr.open_group(self.store, mode='r', path=self.root, **kwargs)
+        return zarr.open(self.store, mode='r')
+    
+    def open_text(self, name):
+        """Flux texte UTF-8 d'une entrée de l'archive"""
+        return io.TextIOWrapper(self.zf.open(name), encoding='utf-8')
+
+
+_zip_indexes = OrderedDict()  # {chemin résolu: ((taille, mtime_ns), ZipArchiveIndex)}
+_zip_indexes_lock = threading.Lock()
+
+
+def _get_zip_index(path):
+    """Index de l'archive, analysé une fois puis réutilisé tant que taille et date sont inchangées"""
+    key = str(Path(path).resolve())
+    st = os.stat(key)
+    signature = (st.st_size, st.st_mtime_ns)
+    with _zip_indexes_lock:
+        cached = _zip_indexes.get(key)
+        if cached is not None and cached[0] == signature:
+            _zip_indexes.move_to_end(key)
+            return cached[1]
+    
+    # Analyse hors verrou (peut prendre plusieurs secondes pour une grosse archive)
+    index = ZipArchiveIndex(key)
+    with _zip_indexes_lock:
+        _zip_indexes[key] = (signature, index)
+        _zip_indexes.move_to_end(key)
+        while len(_zip_indexes) > ZIP_INDEX_CACHE_SIZE:
+            _zip_indexes.popitem(last=False)  # Fermé par le ramasse-miettes une fois inutilisé
+    return index
+
+
+def _shape_layout(shape):
+    """Retourne (hauteur, largeur, canaux) d'un niveau d'après sa forme (YX, CYX, YXC ou ...CYX)"""
+    if len(shape) == 2:
+        return shape[0], shape[1], 1
+    if len(shape) == 3:
+        if shape[0] <= 4:
+            return shape[1], shape[2], shape[0]
+        return shape[0], shape[1], shape[2]
+    return shape[-2], shape[-1], shape[-3]
+
+
+def _open_slide(path, **kwargs):
+    """Ouvre le groupe zarr racine d'une lame (dossier ou ZIP, via l'index partagé de l'archive).
+    
+    kwargs: options de zarr.open_group de zarr 3 (format connu, métadonnées consolidées ignorées...).
+    Avec zarr 2, elles sont ignorées et .zmetadata est utilisé s'il existe.
+    """
+    p = Path(path)
+    if p.is_file() and p.suffix.lower() == '.zip':
+        return _get_zip_index(str(path)).open_group(**kwargs)
+    if not ZARR_V3:
+        return _open_consolidated_v2(str(path))
+    if kwargs:
+        return zarr.open_group(str(path), mode='r', **kwargs)
+    return zarr.open(str(path), mode='r')
+
+
+def _multiscale_paths(attrs):
+    """Chemins des niveaux déclarés par OME-NGFF (multiscales, sous "ome" en v0.5), du plus
+    résolu au moins résolu; None si absents"""
+    multiscales = attrs.get("multiscales") or (attrs.get("ome") or {}).get("multiscales")
+    try:
+        paths = [str(dataset["path"]) for dataset in multiscales[0]["datasets"]]
+    except (TypeError, KeyError, IndexError):
+        return None
+    return paths or None
+
+
+def _layout_cache_path(path):
+    """Fichier de disposition en cache, clé = lame + signature (taille, date) + version du format"""
+    size, mtime = _slide_signature(path)
+    key = f"{Path(path).resolve()}|{size}|{mtime}|v{LAYOUT_CACHE_VERSION}"
+    return CACHE_DIR / "layouts" / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.json"
+
+
+def _open_pyramid(path):
+    """Ouvre une lame et ses niveaux: (groupe ou tableau racine, [niveaux], origine des métadonnées).
+    
+    Disposition en cache (chemins, formes, chunks, types, compresseurs des niveaux): seul le
+    groupe racine est lu. Sinon zarr utilise les métadonnées consolidées s'il y en a (.zmetadata
+    en v2, zarr.json consolidé en v3), les niveaux sont pris dans multiscales plutôt que sondés
+    un à un, et la disposition découverte est mise en cache pour les ouvertures suivantes.
+    """
+    try:
+        cache_path = _layout_cache_path(path)
+    except OSError:
+        cache_path = None
+    
+    if AsyncArray is not None and cache_path is not None and cache_path.exists():
+        try:
+            layout = json.loads(cache_path.read_text(encoding='utf-8'))
+            group = _open_slide(path, zarr_format=layout["zarr_format"], use_consolidated=False)
+            levels = [zarr.Array(AsyncArray(metadata=metadata, store_path=group.store_path / level_path))
+                      for level_path, metadata in layout["levels"]]
+            return group, levels, "cache"
+        except Exception as e:
+            print(f"Disposition en cache illisible {cache_path}: {e}")
+    
+    if ZARR_V3:
+        try:
+            # Ouverture directe en groupe: évite la détection tableau/groupe de zarr.open
+            group = _open_slide(path, use_consolidated=None)
+        except zarr.errors.ContainsArrayError:
+            group = _open_slide(path)
+            return group, [group], "tableau"
+        source = "consolidées" if getattr(group.metadata, "consolidated_metadata", None) else "lues"
+    else:
+        group = _open_slide(path)
+        if isinstance(group, zarr.Array):
+            return group, [group], "tableau"
+        source = "consolidées" if isinstance(group.store, zarr.storage.ConsolidatedMetadataStore) else "lues"
+    
+    # Niveaux déclarés par multiscales, sinon sondage 0, 1, 2...
+    level_paths = _multiscale_paths(group.attrs) or []
+    try:
+        levels = [group[level_path] for level_path in level_paths]
+    except KeyError:
+        levels = []
+    if not levels or not all(isinstance(level, zarr.Array) for level in levels):
+        level_paths, levels = [], []
+        while str(len(levels)) in group:
+            level_paths.append(str(len(levels)))
+            levels.append(group[level_paths[-1]])
+    if not levels:
+        raise ValueError("Structure OME-Zarr non reconnue")
+    
+    if AsyncArray is not None and cache_path is not None:
+        try:
+            layout = {"zarr_format": group.metadata.zarr_format, "levels": []}
+            for level_path, level in zip(level_paths, levels):
+                buffers = level.metadata.to_buffer_dict(default_buffer_prototype())
+                key = "zarr.json" if level.metadata.zarr_format == 3 else ".zarray"
+                layout["levels"].append([level_path, json.loads(buffers[key].to_bytes())])
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp_path.write_text(json.dumps(layout), encoding='utf-8')
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            print(f"Erreur écriture de la disposition {cache_path}: {e}")
+    return group, levels, source
+
+
+def _read_slide_metadata(levels):
+    """Métadonnées d'une lame d'après ses niveaux (dimensions, niveaux, type, canaux), sans décoder de pixels"""
+    base = levels[0]
+    height, width, channels = _shape_layout(base.shape)
+    return {"width": int(width), "height": int(height), "levels": len(levels),
+            "dtype": str(base.dtype), "channels": int(channels)}
+
+
+class SlideCatalog:
+    """Catalogue persistant des lames (SQLite dans CACHE_DIR).
+    
+    Une ligne par lame, clé = chemin, valide tant que la signature (taille, date) est inchangée.
+    Les métadonnées sont calculées une fois en arrière-plan; l'ouverture d'un dossier déjà connu,
+    l'affichage des dimensions et le tri/filtre (requêtes sur l'index) n'ouvrent aucune lame.
+    """
+    METADATA = ("width", "height", "levels", "dtype", "channels", "annotations")
+    # Clés de tri proposées: {libellé: expression SQL}
+    SORT_KEYS = {
+        "Nom": "name COLLATE NOCASE",
+        "Dimensions": "width * height",
+        "Niveaux": "levels",
+        "Annotations": "annotations",
+        "Date": "mtime",
+    }
+    
+    def __init__(self, path=None):
+        self.path = Path(path) if path else CACHE_DIR / "catalog.sqlite"
+        self.conn = None
+        self._lock = threading.Lock()
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS slides (
+            path TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            mtime INTEGER NOT NULL,
+            width INTEGER, height INTEGER, levels INTEGER,
+            dtype TEXT, channels INTEGER, annotations INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS slides_levels ON slides(levels);
+        CREATE INDEX IF NOT EXISTS slides_mtime ON slides(mtime);
+        CREATE TABLE IF NOT EXISTS zip_probes (
+            path TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            mtime INTEGER NOT NULL,
+            is_zarr INTEGER NOT NULL
+        );
+    """
+    
+    def _connection(self):
+        """Connexion partagée entre threads (accès sérialisés par _lock), créée au premier usage.
+        
+        Si le fichier ne peut être créé (dossier de cache en lecture seule ou invalide), le
+        catalogue est tenu en mémoire pour la session: tri, filtre et métadonnées restent
+        disponibles, sans persistance.
+        """
+        if self.conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                conn = sqlite3.connect(str(self.path), check_same_thread=False)
+                conn.executescript(self.SCHEMA)
+            except (OSError, sqlite3.Error) as e:
+                print(f"Catalogue {self.path} indisponible ({e}): catalogue en mémoire pour la session")
+                conn = sqlite3.connect(":memory:", check_same_thread=False)
+                conn.executescript(self.SCHEMA)
+            conn.row_factory = sqlite3.Row
+            self.conn = conn
+        return self.conn
+    
+    @staticmethod
+    def _prefix_range(root):
+        """Bornes (incluse, exclue) des chemins situés sous root: parcours de l'index de la clé"""
+        root = str(root).rstrip(os.sep)
+        return root + os.sep, root + chr(ord(os.sep) + 1)
+    
+    def rows(self, root):
+        """Lignes connues sous root: {chemin: dict}"""
+        low, high = self._prefix_range(root)
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT * FROM slides WHERE path >= ? AND path < ?", (low, high))
+            return {Path(row["path"]): dict(row) for row in cursor}
+    
+    def sync(self, root, signatures):
+        """Aligne le catalogue sur un scan de root ({chemin: signature}).
+        
+        Ajoute les lames nouvelles, remet à zéro les métadonnées des lames modifiées, supprime les
+        lames disparues. Retourne les chemins dont les métadonnées restent à calculer.
+        """
+        low, high = self._prefix_range(root)
+        with self._lock:
+            conn = self._connection()
+            known = {row["path"]: (row["size"], row["mtime"], row["levels"]) for row in conn.execute(
+                "SELECT path, size, mtime, levels FROM slides WHERE path >= ? AND path < ?", (low, high))}
+            current = {str(path): signature for path, signature in signatures.items()}
+            with conn:
+                conn.executemany("DELETE FROM slides WHERE path = ?",
+                                 [(path,) for path in known if path not in current])
+                conn.executemany(
+                    "INSERT OR REPLACE INTO slides (path, name, size, mtime) VALUES (?, ?, ?, ?)",
+                    [(path, Path(path).name, size, mtime) for path, (size, mtime) in current.items()
+                     if known.get(path, (None, None))[:2] != (size, mtime)])
+            return [Path(path) for path, signature in current.items()
+                    if known.get(path, (None, None))[:2] != signature or known[path][2] is None]
+    
+    def zip_probes(self, root):
+        """Détections d'archives ZIP enregistrées sous root: {chemin: ((taille, mtime_ns), contient un zarr)}"""
+        low, high = self._prefix_range(root)
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT * FROM zip_probes WHERE path >= ? AND path < ?", (low, high))
+            return {Path(row["path"]): ((row["size"], row["mtime"]), bool(row["is_zarr"])) for row in cursor}
+    
+    def store_zip_probes(self, root, probes):
+        """Remplace les détections d'archives enregistrées sous root par probes (même format)"""
+        low, high = self._prefix_range(root)
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute("DELETE FROM zip_probes WHERE path >= ? AND path < ?", (low, high))
+                conn.executemany("INSERT INTO zip_probes VALUES (?, ?, ?, ?)",
+                                 [(str(path), size, mtime, int(is_zarr))
+                                  for path, ((size, mtime), is_zarr) in probes.items()])
+    
+    def update(self, path, **metadata):
+        """Enregistre des métadonnées d'une lame déjà cataloguée"""
+        columns = [name for name in metadata if name in self.METADATA]
+        if not columns:
+            return
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                conn.execute(f"UPDATE slides SET {', '.join(f'{name} = ?' for name in columns)} WHERE path = ?",
+                             [metadata[name] for name in columns] + [str(path)])
+    
+    def query(self, root, sort="Nom", descending=False, text=""):
+        """Chemins des lames sous root dont le nom contient text, triés par la clé sort"""
+        low, high = self._prefix_range(root)
+        pattern = "%" + text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        order = self.SORT_KEYS.get(sort, self.SORT_KEYS["Nom"])
+        direction = "DESC" if descending else "ASC"
+        with self._lock:
+            cursor = self._connection().execute(
+                f"SELECT path FROM slides WHERE path >= ? AND path < ? AND name LIKE ? ESCAPE '\\' "
+                f"ORDER BY {order} IS NULL, {order} {direction}, path",
+                (low, high, pattern))
+            return [Path(row["path"]) for row in cursor]
+
+
+def _quick_file_hash(path, block_size=1 << 16):
+    """Empreinte rapide d'un fichier: SHA-1 du premier et du dernier bloc (complète taille et mtime)"""
+    h = hashlib.sha1()
+    with open(path, 'rb') as f:
+        h.update(f.read(block_size))
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        if size > block_size:
+            f.seek(max(block_size, size - block_size))
+            h.update(f.read(block_size))
+    return h.hexdigest()
+
+
+def _iter_geojson_features(stream, top_level, chunk_size=GEOJSON_CHUNK_SIZE):
+    """Itère sur les features d'un objet GeoJSON lu par blocs, sans charger le fichier entier.
+    
+    stream: flux texte. Les autres clés de l'objet racine ("type", "properties", ...) sont
+    décodées dans top_level, qu'elles précèdent ou suivent le tableau "features".
+    Lève ValueError si le flux n'est pas un objet JSON valide.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+    
+    def more():
+        nonlocal buf, pos, eof
+        data = stream.read(chunk_size)
+        eof = not data
+        buf, pos = buf[pos:] + data, 0
+    
+    def skip():
+        # Espaces et virgules séparatrices
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in ' \t\r\n,':
+                pos += 1
+            if pos < len(buf) or eof:
+                return
+            more()
+    
+    def peek():
+        skip()
+        if pos >= len(buf):
+            raise ValueError("fin de fichier inattendue")
+        return buf[pos]
+    
+    def expect(char):
+        nonlocal pos
+        if peek() != char:
+            raise ValueError(f"'{char}' attendu à la position {pos}")
+        pos += 1
+    
+    def value():
+        # Décode une valeur complète, en relisant tant qu'elle est coupée par la fin du bloc
+        nonlocal pos
+        while True:
+            skip()
+            try:
+                obj, end = decoder.raw_decode(buf, pos)
+                # Un nombre coupé par la fin du bloc ("1." ou "1.5e") se décode partiellement:
+                # il n'est complet que suivi d'un délimiteur
+                complete = end < len(buf) and (buf[end] in ' \t\r\n,:]}'
+                                               or not isinstance(obj, (int, float)))
+                if complete or eof:
+                    pos = end
+                    return obj
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            more()
+    
+    if peek() != '{':
+        raise ValueError("objet GeoJSON attendu (FeatureCollection)")
+    expect('{')
+    while peek() != '}':
+        key = value()
+        expect(':')
+        if key != "features":
+            top_level[key] = value()
+            continue
+        expect('[')
+        while peek() != ']':
+            yield value()
+        expect(']')
+
+
+def _concat_ranges(starts, stops):
+    """Concatène les plages [starts[i], stops[i]) en un seul tableau d'indices, sans boucle Python"""
+    starts = np.asarray(starts, dtype=np.int64)
+    lengths = np.asarray(stops, dtype=np.int64) - starts
+    total = int(lengths.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.cumsum(lengths) - lengths
+    return np.arange(total, dtype=np.int64) - np.repeat(offsets - starts, lengths)
+
+
+class CompiledAnnotations:
+    """Annotations GeoJSON compilées en tableaux NumPy compacts.
+    
+    Les sommets de toutes les parties (anneau extérieur des polygones, lignes, points) sont
+    stockés dans un seul tampon float32 (P, 2) ; part_offsets délimite chaque partie dans ce
+    tampon et feature_parts les parties de chaque annotation. Type de géométrie, classe de
+    couleur et boîte englobante sont des tableaux par annotation ; color_ids indexe color_keys
+    (propriétés color, level_id, class_name) et la table RGB colors, résolue une fois par clé.
+    """
+    POLYGON, LINE, POINT, DOT = 1, 2, 3, 4  # DOT: annotation réduite à un pixel (simplification)
+    DEFAULT_COLOR = (255, 87, 34)
+    COLOR_PROPS = ("color", "level_id", "class_name")
+    
+    def __init__(self, coords, part_offsets, feature_parts, geom_types, color_ids, colors, bboxes=None,
+                 color_keys=()):
+        self.coords = np.asarray(coords, dtype=np.float32).reshape(-1, 2)
+        self.part_offsets = np.asarray(part_offsets, dtype=np.int64)
+        self.feature_parts = np.asarray(feature_parts, dtype=np.int64)
+        self.geom_types = np.asarray(geom_types, dtype=np.uint8)
+        self.color_ids = np.asarray(color_ids, dtype=np.int32)
+        self.colors = np.asarray(colors, dtype=np.uint8).reshape(-1, 3)
+        self.bboxes = self._compute_bboxes() if bboxes is None else bboxes
+        self.color_keys = list(color_keys)
+    
+    @classmethod
+    def compile(cls, features, color_of, key_ids=None):
+        """Compile une liste de features GeoJSON; color_of(feature) retourne une couleur '#RRGGBB'.
+        
+        key_ids ({clé de couleur: indice}) peut être partagé entre plusieurs lots compilés
+        séparément: il est complété sur place et les indices restent cohérents entre lots.
+        Les géométries non dessinables (type inconnu, sans sommet) sont ignorées.
+        """
+        flat = []  # Sommets [x, y] de toutes les parties
+        part_offsets = [0]
+        feature_parts = [0]
+        geom_types = []
+        color_ids = []
+        if key_ids is None:
+            key_ids = {}  # {(color, level_id, class_name): indice}
+        
+        for feature in features:
+            n_points = len(flat)
+            try:
+                geom = feature.get("geometry") or {}
+                geom_type = geom.get("type", "")
+                coords = geom.get("coordinates", [])
+                if not coords:
+                    continue
+                if geom_type == "Polygon":
+                    code, parts = cls.POLYGON, [coords[0]]
+                elif geom_type == "MultiPolygon":
+                    code, parts = cls.POLYGON, [polygon[0] for polygon in coords if polygon]
+                elif geom_type == "LineString":
+                    code, parts = cls.LINE, [coords]
+                elif geom_type == "Point":
+                    code, parts = cls.POINT, [[coords[:2] if len(coords) > 1 else [coords[0], coords[0]]]]
+                else:
+                    continue
+                
+                for part in parts:
+                    part_points = [(float(p[0]), float(p[1])) for p in part]
+                    if part_points:
+                        flat.extend(part_points)
+                        part_offsets.append(len(flat))
+            except (AttributeError, TypeError, ValueError, IndexError):
+                del flat[n_points:]
+                del part_offsets[feature_parts[-1] + 1:]
+                continue
+            if len(flat) == n_points:
+                continue
+            
+            # Couleur résolue une fois par combinaison (couleur, niveau, classe)
+            props = feature.get("properties") or {}
+            key = tuple(props.get(name) for name in cls.COLOR_PROPS)
+            try:
+                color_id = key_ids.get(key)
+            except TypeError:
+                key = (None, None, None)  # Valeurs non hachables: couleur par défaut
+                color_id = key_ids.get(key)
+            if color_id is None:
+                color_id = key_ids[key] = len(key_ids)
+            
+            feature_parts.append(len(part_offsets) - 1)
+            geom_types.append(code)
+            color_ids.append(color_id)
+        
+        color_keys = list(key_ids)
+        return cls(np.array(flat, dtype=np.float32), part_offsets, feature_parts,
+                   geom_types, color_ids, cls._resolve_colors(color_keys, color_of), color_keys=color_keys)
+    
+    @classmethod
+    def _resolve_colors(cls, color_keys, color_of):
+        """Table RGB (K, 3) des clés de couleur, via color_of appliqué à leurs propriétés"""
+        colors = []
+        for key in color_keys:
+            props = {name: value for name, value in zip(cls.COLOR_PROPS, key) if value is not None}
+            colors.append(cls._parse_color(color_of({"properties": props})))
+        return colors
+    
+    def recolored(self, color_of):
+        """Mêmes géométries avec la table de couleurs résolue à nouveau (niveaux d'annotation reçus)"""
+        return CompiledAnnotations(self.coords, self.part_offsets, self.feature_parts, self.geom_types,
+                                   self.color_ids, self._resolve_colors(self.color_keys, color_of),
+                                   bboxes=self.bboxes, color_keys=self.color_keys)
+    
+    @classmethod
+    def concatenate(cls, parts):
+        """Assemble des lots compilés avec le même key_ids (la table de couleurs du plus complet est gardée)"""
+        parts = [part for part in parts if len(part)]
+        if not parts:
+            return cls.compile([], None)
+        if len(parts) == 1:
+            return parts[0]
+        point_shift = np.cumsum([0] + [len(part.coords) for part in parts])
+        part_shift = np.cumsum([0] + [len(part.part_offsets) - 1 for part in parts])
+        part_offsets = np.concatenate([part.part_offsets[:-1] + shift for part, shift in zip(parts, point_shift)]
+                                      + [point_shift[-1:]])
+        feature_parts = np.concatenate([part.feature_parts[:-1] + shift for part, shift in zip(parts, part_shift)]
+                                       + [part_shift[-1:]])
+        table = max(reversed(parts), key=lambda part: len(part.color_keys))
+        return cls(np.concatenate([part.coords for part in parts]), part_offsets, feature_parts,
+                   np.concatenate([part.geom_types for part in parts]),
+                   np.concatenate([part.color_ids for part in parts]), table.colors,
+                   bboxes=np.concatenate([part.bboxes for part in parts]), color_keys=table.color_keys)
+    
+    @classmethod
+    def _parse_color(cls, color_hex):
+        try:
+            return int(color_hex[1:3], 16), int(color_hex[3:5], 16), int(color_hex[5:7], 16)
+        except (TypeError, ValueError, IndexError):
+            return cls.DEFAULT_COLOR
+    
+    def _compute_bboxes(self):
+        """Boîtes englobantes [x0, y0, x1, y1] par annotation (chaque annotation a au moins un sommet)"""
+        if len(self) == 0:
+            return np.zeros((0, 4), dtype=np.float64)
+        starts = self.part_offsets[self.feature_parts[:-1]]
+        mins = np.minimum.reduceat(self.coords, starts, axis=0)
+        maxs = np.maximum.reduceat(self.coords, starts, axis=0)
+        return np.hstack([mins, maxs]).astype(np.float64)
+    
+    ARRAYS = ("coords", "part_offsets", "feature_parts", "geom_types", "color_ids", "colors", "bboxes")
+    
+    def save(self, directory, meta):
+        """Écrit les tableaux (.npy, mappables en mémoire) et meta.json dans directory.
+        
+        Écriture dans un dossier temporaire puis renommage: un lecteur ne voit jamais de sidecar partiel.
+        """
+        directory = Path(directory)
+        tmp_dir = directory.with_name(f"{directory.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            for name in self.ARRAYS:
+                np.save(tmp_dir / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+            meta = dict(meta, count=len(self), color_keys=[list(key) for key in self.color_keys])
+            with open(tmp_dir / "meta.json", 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            os.replace(tmp_dir, directory)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if not (directory / "meta.json").exists():
+                raise  # Sinon: écrit entre-temps par une autre instance, rien à faire
+    
+    @classmethod
+    def load(cls, directory):
+        """Relit un sidecar écrit par save(), tableaux mappés en mémoire. Retourne (annotations, meta)"""
+        directory = Path(directory)
+        with open(directory / "meta.json", 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode='r') for name in cls.ARRAYS}
+        color_keys = [tuple(key) for key in meta["color_keys"]]
+        compiled = cls(arrays["coords"], arrays["part_offsets"], arrays["feature_parts"], arrays["geom_types"],
+                       arrays["color_ids"], arrays["colors"], bboxes=arrays["bboxes"], color_keys=color_keys)
+        if len(compiled) != meta["count"]:
+            raise ValueError("sidecar incohérent")
+        return compiled, meta
+    
+    def __len__(self):
+        return len(self.geom_types)
+    
+    def simplified(self, tolerance, dot_size=ANNOTATION_DOT_PX):
+        """Version simplifiée pour un affichage où tolerance (unités niveau 0) vaut un pixel.
+        
+        Les annotations plus petites que dot_size pixels deviennent des DOT (un sommet au centre
+        de la boîte). Les sommets des autres parties sont accrochés à une grille de pas tolerance,
+        arrondi à la puissance de 2 inférieure (grilles emboîtées d'un niveau à l'autre): chaque
+        partie garde le premier sommet de chaque cellule qu'elle visite, plus son dernier sommet.
+        Entièrement vectorisé, et le nombre de sommets gardés ne croît pas avec la tolérance.
+        Ordre des annotations et boîtes englobantes sont conservés: l'index spatial du niveau 0
+        reste valable.
+        """
+        if len(self) == 0:
+            return self
+        tolerance = float(2.0 ** np.floor(np.log2(tolerance)))
+        n_parts = len(self.part_offsets) - 1
+        part_lengths = np.diff(self.part_offsets)
+        part_feature = np.repeat(np.arange(len(self)), np.diff(self.feature_parts))
+        point_part = np.repeat(np.arange(n_parts), part_lengths)
+        coords = self.coords.copy()
+        
+        # Annotations minuscules -> un seul sommet (premier de la première partie) au centre de la boîte
+        extent = np.maximum(self.bboxes[:, 2] - self.bboxes[:, 0], self.bboxes[:, 3] - self.bboxes[:, 1])
+        tiny = (extent < dot_size * tolerance) & (self.geom_types != self.POINT)
+        first_points = self.part_offsets[self.feature_parts[:-1]]
+        coords[first_points[tiny]] = ((self.bboxes[tiny, :2] + self.bboxes[tiny, 2:]) / 2).astype(np.float32)
+        keep = np.zeros(len(coords), dtype=bool)
+        keep[first_points[tiny]] = True
+        
+        # Accrochage à la grille: une clé entière par (partie, cellule), les cellules étant numérotées
+        # dans la boîte de leur partie; le premier sommet de chaque clé (tri stable) est gardé
+        big = np.flatnonzero(~tiny[part_feature[point_part]])
+        if len(big):
+            cells = np.floor(self.coords[big] / tolerance).astype(np.int64)
+            parts = point_part[big]
+            starts = np.flatnonzero(np.concatenate([[True], parts[1:] != parts[:-1]]))
+            stops = np.append(starts[1:], len(big))
+            lo = np.minimum.reduceat(cells, starts, axis=0)
+            span = np.maximum.reduceat(cells, starts, axis=0) - lo + 1
+            sizes = span[:, 0] * span[:, 1]
+            group = np.repeat(np.arange(len(starts)), stops - starts)
+            local = cells - lo[group]
+            keys = (np.cumsum(sizes) - sizes)[group] + local[:, 1] * span[group, 0] + local[:, 0]
+            order = np.argsort(keys, kind='stable')
+            first = np.ones(len(order), dtype=bool)
+            first[1:] = keys[order[1:]] != keys[order[:-1]]
+            keep_big = np.zeros(len(big), dtype=bool)
+            keep_big[order[first]] = True
+            keep_big[stops - 1] = True  # Fermeture des anneaux, extrémité des lignes
+            keep[big] = keep_big
+        
+        # Reconstruction des offsets (les parties vidées des annotations minuscules disparaissent)
+        kept_per_part = np.bincount(point_part[keep], minlength=n_parts)
+        live_parts = kept_per_part > 0
+        part_offsets = np.concatenate([[0], np.cumsum(kept_per_part[live_parts])])
+        feature_parts = np.concatenate([[0], np.cumsum(np.bincount(part_feature[live_parts],
+                                                                   minlength=len(self)))])
+        geom_types = np.where(tiny, self.DOT, self.geom_types).astype(np.uint8)
+        return CompiledAnnotations(coords[keep], part_offsets, feature_parts, geom_types,
+                                   self.color_ids, self.colors, bboxes=self.bboxes, color_keys=self.color_keys)
+    
+    @property
+    def nbytes(self):
+        return sum(a.nbytes for a in (self.coords, self.part_offsets, self.feature_parts,
+                                      self.geom_types, self.color_ids, self.colors, self.bboxes))
+    
+    def gather(self, feature_ids):
+        """Sommets des annotations demandées.
+        
+        Retourne (points (P, 2) float32, offsets des parties dans points, annotation de chaque partie).
+        """
+        feature_ids = np.asarray(feature_ids, dtype=np.int64)
+        p0, p1 = self.feature_parts[feature_ids], self.feature_parts[feature_ids + 1]
+        parts = _concat_ranges(p0, p1)
+        part_features = np.repeat(feature_ids, p1 - p0)
+        s0, s1 = self.part_offsets[parts], self.part_offsets[parts + 1]
+        offsets = np.concatenate([[0], np.cumsum(s1 - s0)])
+        return self.coords[_concat_ranges(s0, s1)], offsets, part_features
+
+
+class AnnotationIndex:
+    """Index spatial en grille régulière des boîtes englobantes des annotations (niveau 0).
+    
+    Construit une fois au chargement: une requête ne parcourt que les cellules couvertes par la
+    zone demandée, le coût d'un rendu dépend donc des annotations visibles et non du total.
+    Les paires (cellule, annotation) sont triées par clé de cellule (ligne par ligne): les cellules
+    d'une ligne de la zone forment une plage contiguë, trouvée par recherche dichotomique.
+    Les annotations couvrant trop de cellules (grandes régions) sont gardées à part et testées
+    directement sur leur boîte.
+    """
+    MAX_CELLS_PER_FEATURE = 64
+    BRUTE_FORCE_RATIO = 64  # Au-delà de N / 64 cellules visitées, test direct sur toutes les boîtes
+    
+    def __init__(self, bboxes, cell_size=None):
+        # bboxes: ndarray (N, 4) float [x0, y0, x1, y1], NaN pour les géométries vides
+        self.bboxes = np.asarray(bboxes, dtype=np.float64).reshape(-1, 4)
+        self.keys = np.zeros(0, dtype=np.int64)  # Clés de cellule triées, une par paire
+        self.ids = np.zeros(0, dtype=np.int64)  # Annotation de chaque paire
+        self.origin = (0, 0)  # Cellule (cx, cy) de clé 0
+        self.grid_width = 1
+        
+        valid = np.flatnonzero(~np.isnan(self.bboxes).any(axis=1))
+        if cell_size is None:
+            cell_size = self._default_cell_size(self.bboxes[valid])
+        self.cell_size = float(cell_size)
+        
+        c0 = np.floor(self.bboxes[valid, :2] / self.cell_size).astype(np.int64)
+        c1 = np.floor(self.bboxes[valid, 2:] / self.cell_size).astype(np.int64)
+        span_x = c1[:, 0] - c0[:, 0] + 1
+        n_cells = span_x * (c1[:, 1] - c0[:, 1] + 1)
+        small = n_cells <= self.MAX_CELLS_PER_FEATURE
+        self.large = valid[~small]  # Annotations trop étendues pour la grille
+        
+        # Paires (annotation, cellule) générées en bloc, puis triées par cellule
+        ids, c0, c1, span_x, n_cells = valid[small], c0[small], c1[small], span_x[small], n_cells[small]
+        if len(ids) == 0:
+            return
+        self.origin = (int(c0[:, 0].min()), int(c0[:, 1].min()))
+        self.grid_width = int(c1[:, 0].max()) - self.origin[0] + 1
+        starts = np.cumsum(n_cells) - n_cells
+        k = np.arange(int(n_cells.sum())) - np.repeat(starts, n_cells)
+        span_x = np.repeat(span_x, n_cells)
+        cx = np.repeat(c0[:, 0], n_cells) + k % span_x
+        cy = np.repeat(c0[:, 1], n_cells) + k // span_x
+        keys = (cy - self.origin[1]) * self.grid_width + (cx - self.origin[0])
+        ids = np.repeat(ids, n_cells)
+        
+        order = np.lexsort((ids, keys))
+        self.keys, self.ids = keys[order], ids[order]
+    
+    @staticmethod
+    def _default_cell_size(bboxes):
+        """Taille de cellule: ~4 annotations par cellule en moyenne, au moins la taille médiane d'une boîte"""
+        if len(bboxes) == 0:
+            return 1024.0
+        extent = np.nanmax(bboxes[:, 2:], axis=0) - np.nanmin(bboxes[:, :2], axis=0)
+        area = max(float(extent[0]) * float(extent[1]), 1.0)
+        median = float(np.median(np.maximum(bboxes[:, 2] - bboxes[:, 0], bboxes[:, 3] - bboxes[:, 1])))
+        return max(np.sqrt(4 * area / len(bboxes)), median, 1.0)
+    
+    def __len__(self):
+        return len(self.bboxes)
+    
+    def query(self, x0, y0, x1, y1):
+        """Retourne les indices (triés, ordre du fichier) des annotations intersectant la zone"""
+        cs = self.cell_size
+        cx0, cy0 = int(np.floor(x0 / cs)), int(np.floor(y0 / cs))
+        cx1, cy1 = int(np.floor(x1 / cs)), int(np.floor(y1 / cs))
+        
+        n_query_cells = (cx1 - cx0 + 1) * (cy1 - cy0 + 1)
+        if n_query_cells * self.BRUTE_FORCE_RATIO >= len(self.bboxes):
+            # Zone large (vue dézoomée): un test vectorisé sur toutes les boîtes coûte moins que la grille
+            b = self.bboxes
+            keep = (b[:, 2] >= x0) & (b[:, 0] <= x1) & (b[:, 3] >= y0) & (b[:, 1] <= y1)
+            return np.flatnonzero(keep)
+        
+        # Une plage de clés par ligne de cellules, bornée à la grille occupée
+        ox, oy = self.origin
+        cx0, cx1 = max(cx0, ox), min(cx1, ox + self.grid_width - 1)
+        rows = np.arange(max(cy0, oy), cy1 + 1, dtype=np.int64) - oy
+        found = [self.large]
+        if cx0 <= cx1 and len(rows) and len(self.keys):
+            lo = np.searchsorted(self.keys, rows * self.grid_width + (cx0 - ox), side='left')
+            hi = np.searchsorted(self.keys, rows * self.grid_width + (cx1 - ox), side='right')
+            found.append(self.ids[_concat_ranges(lo, hi)])
+        candidates = np.unique(np.concatenate(found))
+        if len(candidates) == 0:
+            return candidates
+        
+        b = self.bboxes[candidates]
+        keep = (b[:, 2] >= x0) & (b[:, 0] <= x1) & (b[:, 3] >= y0) & (b[:, 1] <= y1)
+        return candidates[keep]
 
 
 class OMEZarrViewer:
@@ -52,14 +1352,50 @@ class OMEZarrViewer:
         self.zarr_store = None
         self.zarr_path = None
         self.pyramid = []
-        self.current_level = 0
-        self.view_x = 0
+        self.load_started = None  # Début de l'ouverture en cours, jusqu'à la première image nette
+        self.load_timings = {}  # Temps d'ouverture de la lame (ms) et origine des métadonnées
+        self.current_level = 0  # Niveau source du rendu (choisi selon le zoom)
+        self.zoom = 1.0  # Pixels écran par pixel du niveau 0
+        self.view_x = 0  # Position de vue en pixels écran (image affichée au zoom courant)
         self.view_y = 0
         self.canvas_width = 1000
         self.canvas_height = 700
         
-        # Cache
-        self.tile_cache = TileCache(max_size=100)
+        # Cache (tuiles de la grille alignée sur les chunks)
+        self.tile_cache = TileCache()
+        self.tile_sizes = {}  # {niveau: (tile_h, tile_w)}
+        
+        # Calques d'annotations rastérisés par tuile (RGBA), clé (lame, niveau, ty, tx, version)
+        self.overlay_cache = TileCache(max_bytes=OVERLAY_CACHE_MB * 1024 * 1024)
+        
+        # Chargement des tuiles en arrière-plan
+        self.tile_loader = BackgroundLoader(num_workers=TILE_LOADER_WORKERS)
+        self.tile_generation = 0
+        self.chunk_locks = [threading.Lock() for _ in range(64)]  # Décodage d'un chunk partagé par plusieurs tuiles
+        self.missing_tiles = 0  # Tuiles visibles en cours de chargement
+        
+        # Préchargement (vitesse de déplacement en px/s, dernière position souris)
+        self.pan_velocity = (0.0, 0.0)
+        self.last_drag_time = None
+        self.mouse_x = None
+        self.mouse_y = None
+        self.prefetched_keys = {}  # Tuiles préchargées pas encore affichées (ordre d'arrivée)
+        self.prefetch_stats = {"issued": 0, "loaded": 0, "used": 0}
+        
+        # Tuiles affichées: items du canvas persistants {(ty, tx): (item_id, PhotoImage, aperçu grossier)}
+        self.tile_items = {}
+        self.tile_items_state = None  # (lame, niveau, annotations) des items affichés
+        self.tile_items_origin = (0, 0)  # Position de vue (arrondie) des items affichés
+        self.photo_pool = OrderedDict()  # {(w, h): [PhotoImage]}, taille la moins récente en tête
+        self.photo_pool_bytes = 0
+        self.display_max = None  # Max d'affichage commun pour les images non uint8
+        self.overview = None  # Niveau le plus bas gardé en mémoire (aperçu instantané)
+        self.overview_pending = False  # Lecture de l'aperçu en cours (thread de chargement)
+        
+        # Planification des rendus (au plus MAX_FPS par seconde)
+        self.frame_interval = 1.0 / max(1, MAX_FPS)
+        self.last_render_time = 0.0
+        self._render_scheduled = False
         
         # Drag
         self.drag_start_x = 0
@@ -69,18 +1405,45 @@ class OMEZarrViewer:
         # Liste des fichiers zarr trouvés
         self.zarr_files = []
         self.root_folder = None
+        self.scan_id = 0  # Scan en cours (un nouveau scan abandonne le précédent)
+        self.tree_folders = {}  # {parties du chemin relatif: item du dossier dans file_tree}
+        self.tree_child_names = {}  # {item parent: noms triés des enfants}
+        self.tree_items = {}  # {chemin de la lame: item dans file_tree}
+        self.scan_running = False
+        self.scan_listings = {}  # {dossier: (mtime_ns, listage)} du dernier scan
+        self.slide_signatures = {}  # {chemin: signature} des lames du dernier scan
+        self.catalog = SlideCatalog()  # Métadonnées persistantes des lames (SQLite)
+        self.slide_info = {}  # {chemin: métadonnées du catalogue} des lames listées
+        self.tree_query = None  # (tri, décroissant, filtre) si la liste n'est pas l'arborescence par nom
+        self.sort_var = tk.StringVar(value="Nom")
+        self.sort_desc = tk.BooleanVar(value=False)
+        self.filter_var = tk.StringVar(value="")
         
         # Annotations
-        self.annotations = []  # Liste des features GeoJSON
+        self.annotations = CompiledAnnotations.compile([], None)  # Annotations compilées (CompiledAnnotations)
         self.annotations_visible = tk.BooleanVar(value=True)
         self.annotation_levels = {}  # Niveaux d'annotation (couleurs, etc.)
+        self.annotation_version = 0  # Incrémenté à chaque changement du jeu d'annotations
+        self.annotation_index = None  # Index spatial (AnnotationIndex) des annotations chargées
+        self.annotation_lod = {}  # {niveau: CompiledAnnotations simplifiées, None si en cours}, en arrière-plan
+        self.annotation_heatmaps = {}  # {niveau: (grille RGBA, masque des annotations agrégées)}
+        self.annotation_load_id = 0  # Chargement en cours (un chargement d'une autre lame s'abandonne)
         
         # Mode d'affichage des fichiers
         self.view_mode = tk.StringVar(value="list")  # "list" ou "thumbnails"
-        self.thumbnails = {}  # Cache des thumbnails {path: PhotoImage}
+        self.thumbnails = {}  # Cache des thumbnails {path: image PIL}
         self.thumbnail_size = 80  # Taille des vignettes
+        self.thumb_loader = BackgroundLoader(num_workers=THUMBNAIL_WORKERS)
+        self.thumb_cells = {}  # Cellules matérialisées {index: cellule} (lignes visibles seulement)
+        self.thumb_cell_pool = []  # Cellules masquées, réutilisables
+        self.thumb_cols = 1
+        self.thumb_rows = 0
+        self.thumb_pending = set()  # Vignettes demandées pas encore reçues
+        self.thumb_total = 0
         
         self._setup_ui()
+        if FOLDER_POLL_SECONDS > 0:
+            self.root.after(FOLDER_POLL_SECONDS * 1000, self._poll_root_folder)
         self.root.mainloop()
     
     def _setup_ui(self):
@@ -111,6 +1474,18 @@ class OMEZarrViewer:
         self.folder_label = ttk.Label(left_panel, text="Aucun dossier", wraplength=260, foreground="gray")
         self.folder_label.pack(fill=tk.X, padx=5, pady=(0, 5))
         
+        # Filtre par nom et tri (requêtes sur le catalogue)
+        query_frame = ttk.Frame(left_panel)
+        query_frame.pack(fill=tk.X, padx=5)
+        self.filter_var.trace_add("write", lambda *args: self._apply_tree_query())
+        ttk.Entry(query_frame, textvariable=self.filter_var, width=12).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        sort_combo = ttk.Combobox(query_frame, textvariable=self.sort_var, values=list(SlideCatalog.SORT_KEYS),
+                                  state="readonly", width=11)
+        sort_combo.pack(side=tk.LEFT, padx=2)
+        sort_combo.bind("<<ComboboxSelected>>", lambda e: self._apply_tree_query())
+        ttk.Checkbutton(query_frame, text="↓", variable=self.sort_desc,
+                        command=self._apply_tree_query).pack(side=tk.LEFT)
+        
         # Container pour les fichiers (liste ou thumbnails)
         tree_frame = ttk.LabelFrame(left_panel, text="Fichiers OME-Zarr", padding=5)
         tree_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
@@ -123,7 +1498,11 @@ class OMEZarrViewer:
         self.tree_frame = ttk.Frame(self.files_container)
         self.tree_frame.pack(fill=tk.BOTH, expand=True)
         
-        self.file_tree = ttk.Treeview(self.tree_frame, selectmode='browse', show='tree')
+        # Colonne "path" cachée (chemin de la lame), "info" = métadonnées du catalogue
+        self.file_tree = ttk.Treeview(self.tree_frame, selectmode='browse', show='tree',
+                                      columns=("path", "info"), displaycolumns=("info",))
+        self.file_tree.column("#0", width=160)
+        self.file_tree.column("info", width=150, anchor=tk.E)
         tree_scroll = ttk.Scrollbar(self.tree_frame, orient=tk.VERTICAL, command=self.file_tree.yview)
         self.file_tree.configure(yscrollcommand=tree_scroll.set)
         
@@ -144,26 +1523,22 @@ class OMEZarrViewer:
         
         self.thumb_canvas = tk.Canvas(self.thumb_frame, bg="#2a2a3a", highlightthickness=0, width=100)
         self.thumb_scrollbar = ttk.Scrollbar(self.thumb_frame, orient=tk.VERTICAL, command=self.thumb_canvas.yview)
-        self.thumb_canvas.configure(yscrollcommand=self.thumb_scrollbar.set)
+        self.thumb_canvas.configure(yscrollcommand=self._on_thumb_scroll)
         
         self.thumb_canvas.grid(row=0, column=0, sticky="nsew")
         self.thumb_scrollbar.grid(row=0, column=1, sticky="ns")
         
-        # Frame interne pour les thumbnails
-        self.thumb_inner = ttk.Frame(self.thumb_canvas)
-        self.thumb_canvas_window = self.thumb_canvas.create_window((0, 0), window=self.thumb_inner, anchor='nw')
+        # Les vignettes sont des items du canvas (grille virtualisée, voir _update_visible_thumbnails)
+        self.thumb_canvas.configure(yscrollincrement=20)
         
         # Binding pour redimensionner
-        self.thumb_inner.bind("<Configure>", self._on_thumb_frame_configure)
         self.thumb_canvas.bind("<Configure>", self._on_thumb_canvas_configure)
         
-        # Binding molette souris pour scroll
+        # Binding molette souris pour scroll, double-clic pour ouvrir
         self.thumb_canvas.bind("<MouseWheel>", self._on_thumb_mousewheel)
         self.thumb_canvas.bind("<Button-4>", lambda e: self.thumb_canvas.yview_scroll(-1, "units"))
         self.thumb_canvas.bind("<Button-5>", lambda e: self.thumb_canvas.yview_scroll(1, "units"))
-        self.thumb_inner.bind("<MouseWheel>", self._on_thumb_mousewheel)
-        self.thumb_inner.bind("<Button-4>", lambda e: self.thumb_canvas.yview_scroll(-1, "units"))
-        self.thumb_inner.bind("<Button-5>", lambda e: self.thumb_canvas.yview_scroll(1, "units"))
+        self.thumb_canvas.bind("<Double-1>", self._on_thumb_double_click)
         
         # Compteur fichiers
         self.file_count_label = ttk.Label(left_panel, text="0 fichier(s)")
@@ -193,7 +1568,7 @@ class OMEZarrViewer:
         ttk.Separator(ctrl_frame, orient=tk.VERTICAL).pack(side=tk.LEFT, fill=tk.Y, padx=5)
         self.annot_check = ttk.Checkbutton(ctrl_frame, text="📝 Annotations", 
                                             variable=self.annotations_visible,
-                                            command=self._render)
+                                            command=self._request_render)
         self.annot_check.pack(side=tk.LEFT, padx=5)
         
         self.annot_count_label = ttk.Label(ctrl_frame, text="", foreground="gray")
@@ -213,9 +1588,17 @@ class OMEZarrViewer:
         self.canvas.pack(fill=tk.BOTH, expand=True)
         
         # Barre de statut
+        status_frame = ttk.Frame(right_panel)
+        status_frame.pack(fill=tk.X)
+        
         self.status_var = tk.StringVar(value="Prêt - Ouvrez un dossier ou un fichier OME-Zarr")
-        status_bar = ttk.Label(right_panel, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
-        status_bar.pack(fill=tk.X)
+        status_bar = ttk.Label(status_frame, textvariable=self.status_var, relief=tk.SUNKEN, anchor=tk.W)
+        status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Statistiques du cache de tuiles (clic = détail par niveau dans la console)
+        self.cache_label = ttk.Label(status_frame, text="", relief=tk.SUNKEN, anchor=tk.E)
+        self.cache_label.pack(side=tk.RIGHT)
+        self.cache_label.bind("<Button-1>", lambda e: self._log_cache_stats())
         
         # Bindings canvas
         self.canvas.bind("<ButtonPress-1>", self._on_drag_start)
@@ -246,210 +1629,425 @@ class OMEZarrViewer:
         self.root_folder = Path(folder)
         self.folder_label.config(text=str(self.root_folder), foreground="black")
         self._scan_zarr_files()
-        self._populate_file_tree()
+        self._populate_file_tree()  # Vide l'arborescence, remplie au fil du scan
+        if self.view_mode.get() == "thumbnails":
+            self._populate_thumbnails()
     
-    def _scan_zarr_files(self):
-        """Scanne le dossier pour trouver les fichiers .zarr (non récursif pour éviter les blocages MRXS)"""
-        self.zarr_files = []
+    def _scan_zarr_files(self, incremental=False):
+        """Lance le scan du dossier racine en arrière-plan (SCAN_DEPTH niveaux, dossiers MRXS ignorés).
+        
+        Un dossier déjà catalogué est affiché immédiatement depuis le catalogue et le scan n'applique
+        que le diff; sinon les lames trouvées sont ajoutées au fil du scan. Un nouveau scan annule
+        le précédent. En mode incrémental, les listages des dossiers dont la date n'a pas changé sont
+        réutilisés, et seules les lames ajoutées, supprimées ou modifiées sont mises à jour
+        (arborescence, grille et vignettes des autres lames conservées).
+        """
+        self.scan_id += 1
+        if not incremental:
+            self.zarr_files = []
+            self.scan_listings = {}
+            self.slide_signatures = {}
+            self.slide_info = {}
         
         if not self.root_folder:
+            self.scan_running = False
             return
         
-        def is_ome_zarr(path):
-            """Vérifie si c'est un OME-Zarr valide (v2 ou v3)"""
-            p = Path(path)
+        stream = False
+        if not incremental:
             try:
-                # Méthode 1: Zarr v3 (zarr.json à la racine)
-                if (p / 'zarr.json').exists():
-                    # Vérifie qu'il y a au moins un niveau pyramidal (dossier "0")
-                    if (p / '0').is_dir():
-                        return True
-                
-                # Méthode 2: Zarr v2 (.zgroup ou .zattrs)
-                has_zgroup = (p / '.zgroup').exists()
-                has_zattrs = (p / '.zattrs').exists()
-                
-                if has_zgroup or has_zattrs:
-                    if (p / '0').is_dir():
-                        return True
-                    if (p / '.zarray').exists():
-                        return True
-                
-                # Méthode 3: Dossier .zarr/.ome.zarr avec sous-dossiers numériques
-                if p.suffix in ['.zarr'] or '.zarr' in p.name:
-                    if (p / '0').is_dir():
-                        return True
-                
-                return False
-            except (PermissionError, OSError):
-                return False
-        
-        def is_zarr_zip(path):
-            """Vérifie si c'est un fichier ZIP contenant un Zarr"""
-            p = Path(path)
-            if not p.is_file():
-                return False
-            if p.suffix.lower() != '.zip':
-                return False
-            
-            # Patterns reconnus: *.zarr.zip, *.ome.zarr.zip, *_zarr.zip, etc.
-            name_lower = p.name.lower()
-            if '.zarr.zip' in name_lower:
-                return True
-            if 'zarr' in p.stem.lower():
-                return True
-            
-            # Vérifier le contenu du ZIP (optionnel, plus lent)
-            # On pourrait ouvrir le ZIP et chercher zarr.json ou .zgroup
-            
-            return False
-        
-        def is_mrxs_folder(path):
-            """Détecte les dossiers MRXS à ignorer (contiennent des milliers de tuiles)"""
-            p = Path(path)
-            # Les dossiers MRXS ont souvent un fichier .mrxs associé ou contiennent des .dat/.jpg
-            if p.suffix.lower() == '.mrxs':
-                return True
-            # Vérifie si c'est un dossier data MRXS (nom commence par le fichier mrxs)
-            parent = p.parent
-            mrxs_file = parent / f"{p.name}.mrxs"
-            if mrxs_file.exists():
-                return True
-            return False
-        
-        scanned_count = 0
-        skipped_count = 0
-        zip_count = 0
-        
-        # Scan non-récursif du dossier principal
+                self.slide_info = self.catalog.rows(self.root_folder)
+            except sqlite3.Error as e:
+                print(f"Erreur lecture du catalogue {self.catalog.path}: {e}")
+            self.zarr_files = sorted(self.slide_info)
+            self.slide_signatures = {path: (row["size"], row["mtime"]) for path, row in self.slide_info.items()}
+            stream = not self.zarr_files
+            self.file_count_label.config(text=f"{len(self.zarr_files)} fichier(s)")
+            self._set_status(f"Scan de {self.root_folder}…")
+        
+        self.scan_running = True
+        thread = threading.Thread(target=self._folder_scanner,
+                                  args=(self.scan_id, self.root_folder, SCAN_DEPTH, self.scan_listings,
+                                        dict(self.slide_signatures), stream, incremental), daemon=True)
+        thread.start()
+    
+    def _folder_scanner(self, scan_id, root_folder, max_depth, previous, known_signatures, stream, incremental):
+        """Thread de scan: listages os.scandir en parallèle, parcours en largeur jusqu'à max_depth.
+        
+        Un dossier est listé une seule fois: son listage sert à la fois à reconnaître un OME-Zarr
+        et, sinon, à poursuivre dans ses sous-dossiers. previous contient les listages du scan
+        précédent ({chemin: (mtime_ns, listage)}), réutilisés pour les dossiers inchangés ou
+        devenus illisibles (partage réseau momentanément indisponible); la signature connue
+        (known_signatures) d'une lame dont le dossier n'a pas changé est gardée sans stat, celle d'une
+        archive vient de sa détection. stream: publie les lames au
+        fil du scan (liste initialement vide). Les archives ZIP sont reconnues à leur contenu (fin
+        de l'archive), résultat mémorisé dans le catalogue. Le catalogue est ensuite synchronisé
+        et ses métadonnées manquantes calculées dans ce même thread.
+        """
+        counts = {"scanned": 0, "skipped": 0, "zip": 0}
         try:
-            for item in self.root_folder.iterdir():
-                # Fichiers ZIP zarr
-                if item.is_file():
-                    if is_zarr_zip(item):
-                        self.zarr_files.append(item)
-                        zip_count += 1
-                    continue
-                
-                # Dossiers
-                if not item.is_dir():
-                    continue
-                
-                # Ignore les dossiers cachés et MRXS
-                if item.name.startswith('.'):
-                    continue
-                if is_mrxs_folder(item):
-                    skipped_count += 1
-                    continue
-                
-                scanned_count += 1
-                
-                # Vérifie si c'est un OME-Zarr (par extension ou contenu)
-                if item.suffix in ['.zarr', '.ome.zarr'] or 'zarr' in item.name.lower():
-                    if is_ome_zarr(item):
-                        self.zarr_files.append(item)
-                elif is_ome_zarr(item):
-                    self.zarr_files.append(item)
-            
-            # Scan un niveau plus profond (sous-dossiers directs) - mais pas dans les dossiers MRXS
-            for subdir in self.root_folder.iterdir():
-                if not subdir.is_dir():
-                    continue
-                if subdir.name.startswith('.'):
-                    continue
-                if is_mrxs_folder(subdir):
-                    continue
-                # Ignore les dossiers déjà identifiés comme zarr
-                if subdir in self.zarr_files:
-                    continue
+            known_zips = self.catalog.zip_probes(root_folder)
+        except sqlite3.Error as e:
+            print(f"Erreur lecture du catalogue {self.catalog.path}: {e}")
+            known_zips = {}
+        zip_probes = {}
+        listings = {}
+        unchanged = set()  # Dossiers dont le listage précédent est réutilisé
+        found_all = []
+        found = []
+        last_publish = time.monotonic()
+        
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS) as pool:
+            pending = {pool.submit(_list_dir_cached, root_folder, previous): (root_folder, 0)}
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                if scan_id != self.scan_id:
+                    for future in pending:
+                        future.cancel()
+                    return  # Scan remplacé par un autre
                 
-                try:
-                    for item in subdir.iterdir():
-                        # Fichiers ZIP zarr dans le sous-dossier
-                        if item.is_file():
-                            if is_zarr_zip(item):
-                                self.zarr_files.append(item)
-                                zip_count += 1
+                for future in done:
+                    folder, depth = pending.pop(future)
+                    if depth is None:
+                        # Détection d'une archive ZIP (folder = chemin de l'archive)
+                        try:
+                            zip_probes[folder] = future.result()
+                        except OSError:
                             continue
-                        
-                        if not item.is_dir():
+                        if zip_probes[folder][1]:
+                            found.append(folder)
+                            counts["zip"] += 1
+                        continue
+                    try:
+                        listing = future.result()
+                    except OSError as e:
+                        if depth == 0:
+                            self.root.after(0, self._set_status, f"Erreur de scan: {e}")
+                        listing = previous.get(folder)
+                        if listing is None:
                             continue
-                        if item.name.startswith('.'):
+                    if listing is previous.get(folder):
+                        unchanged.add(folder)
+                    listings[folder] = listing
+                    entries = listing[1]
+                    
+                    if depth > 0 and _is_ome_zarr_listing(folder.name, entries):
+                        found.append(folder)
+                        continue
+                    if depth >= max_depth:
+                        continue
+                    
+                    names = {name for name, _, _ in entries}
+                    for name, is_dir, is_file in entries:
+                        if is_file:
+                            if name.lower().endswith('.zip'):
+                                archive = folder / name
+                                pending[pool.submit(_probe_zarr_zip, archive, known_zips)] = (archive, None)
+                            continue
+                        # Ignore les dossiers cachés et MRXS
+                        if not is_dir or name.startswith('.'):
                             continue
-                        if is_mrxs_folder(item):
+                        if _is_mrxs_folder(name, names):
+                            counts["skipped"] += 1
                             continue
-                        
-                        scanned_count += 1
-                        
-                        if item.suffix in ['.zarr', '.ome.zarr'] or 'zarr' in item.name.lower():
-                            if is_ome_zarr(item):
-                                self.zarr_files.append(item)
-                        elif is_ome_zarr(item):
-                            self.zarr_files.append(item)
-                except (PermissionError, OSError):
+                        counts["scanned"] += 1
+                        child = folder / name
+                        pending[pool.submit(_list_dir_cached, child, previous)] = (child, depth + 1)
+                
+                # Publication au fil de l'eau (liste vide seulement: sinon seul le diff est appliqué)
+                if stream and found and time.monotonic() - last_publish >= 0.2:
+                    self.root.after(0, self._on_slides_found, scan_id, found)
+                    found_all.extend(found)
+                    found = []
+                    last_publish = time.monotonic()
+        
+        found_all.extend(found)
+        # Signature de chaque lame: une lame réécrite (même chemin) doit regénérer sa vignette
+        # (restat seulement pour les lames dont le dossier a changé)
+        signatures = {}
+        for path in found_all:
+            if path in zip_probes:
+                signatures[path] = zip_probes[path][0]
+                continue
+            if path in unchanged and path in known_signatures:
+                signatures[path] = known_signatures[path]
+                continue
+            try:
+                signatures[path] = _slide_signature(path)
+            except OSError:
+                continue
+        if scan_id != self.scan_id:
+            return
+        try:
+            missing = self.catalog.sync(root_folder, signatures)
+            if zip_probes != known_zips:
+                self.catalog.store_zip_probes(root_folder, zip_probes)
+        except sqlite3.Error as e:
+            print(f"Erreur mise à jour du catalogue {self.catalog.path}: {e}")
+            missing = []
+        self.root.after(0, self._on_scan_finished, scan_id, found_all, signatures, listings,
+                        counts, incremental)
+        self._fill_catalog(scan_id, missing)
+    
+    def _fill_catalog(self, scan_id, paths):
+        """Calcule les métadonnées manquantes du catalogue (thread du scan), publiées par lots"""
+        rows = {}
+        last_publish = time.monotonic()
+        for path in paths:
+            if scan_id != self.scan_id:
+                return  # Repris par le scan suivant
+            try:
+                # Ouverture via _open_pyramid: la disposition mise en cache accélère la 1re ouverture
+                group, levels, _ = _open_pyramid(path)
+                metadata = _read_slide_metadata(levels)
+                metadata["annotations"] = self._cached_annotation_count(path, group)
+                self.catalog.update(path, **metadata)
+            except Exception as e:
+                # Lame illisible: marquée (0 niveau) pour ne pas être réessayée avant modification
+                print(f"Métadonnées illisibles {path}: {e}")
+                metadata = {"levels": 0}
+                try:
+                    self.catalog.update(path, **metadata)
+                except sqlite3.Error:
                     pass
-                    
-        except (PermissionError, OSError) as e:
-            self._set_status(f"Erreur de scan: {e}")
+            rows[path] = metadata
+            if time.monotonic() - last_publish >= 0.5:
+                self.root.after(0, self._on_catalog_updated, scan_id, rows, False)
+                rows = {}
+                last_publish = time.monotonic()
+        self.root.after(0, self._on_catalog_updated, scan_id, rows, True)
+    
+    def _cached_annotation_count(self, zarr_path, zarr_store):
+        """Nombre d'annotations d'une lame: 0 sans source, celui du sidecar compilé s'il est à jour,
+        sinon None (connu au premier chargement des annotations)"""
+        sources = self._annotation_sources(zarr_path, zarr_store)
+        if not sources:
+            return 0
+        meta_path = self._annotation_sidecar_path(zarr_path, sources) / "meta.json"
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                return json.load(f)["count"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _on_catalog_updated(self, scan_id, rows, done):
+        """Affiche les métadonnées calculées (thread UI)"""
+        for path, metadata in rows.items():
+            if path in self.slide_signatures:
+                self.slide_info.setdefault(path, {}).update(metadata)
+                self._update_tree_info(path)
+        if done and scan_id == self.scan_id:
+            self.scan_running = False
+        if rows and self.tree_query is not None and self.tree_query[0] != "Nom":
+            self._populate_file_tree()  # L'ordre dépend des métadonnées arrivées
+    
+    def _on_slides_found(self, scan_id, paths):
+        """Ajoute des lames trouvées par le scan en cours (thread UI)"""
+        if scan_id != self.scan_id:
+            return
+        added = self._add_slides(paths)
+        self._on_slides_changed(added)
+        self._set_status(f"Scan en cours… {len(self.zarr_files)} OME-Zarr trouvé(s)")
+    
+    def _on_scan_finished(self, scan_id, paths, signatures, listings, counts, incremental):
+        """Fin du scan (thread UI): applique le diff avec la liste affichée"""
+        if scan_id != self.scan_id:
+            return
+        self.scan_listings = listings
+        
+        added = self._add_slides(paths)
+        present = set(paths)
+        removed = [path for path in self.zarr_files if path not in present]
+        for path in removed:
+            self._remove_slide(path)
+        # Lames modifiées: vignette en mémoire invalidée (le cache disque est indexé par signature)
+        changed = [path for path, signature in signatures.items()
+                   if self.slide_signatures.get(path, signature) != signature]
+        for path in changed:
+            self.thumbnails.pop(str(path), None)
+            self.slide_info.pop(path, None)
+            self._update_tree_info(path)
+        self.slide_signatures = signatures
+        self._on_slides_changed(added + changed, bool(removed))
+        
+        if incremental:
+            # Rescan silencieux: la barre de statut ne signale que les changements
+            if added or removed or changed:
+                self._set_status(f"Dossier mis à jour: {len(added)} ajoutée(s), {len(removed)} "
+                                 f"supprimée(s), {len(changed)} modifiée(s)")
+        elif self.zarr_files:
+            zip_info = f", {counts['zip']} ZIP" if counts['zip'] > 0 else ""
+            self._set_status(f"{len(self.zarr_files)} OME-Zarr trouvé(s){zip_info} "
+                             f"(scanné: {counts['scanned']}, ignoré: {counts['skipped']} MRXS)")
+        else:
+            self._set_status(f"Aucun OME-Zarr trouvé (scanné: {counts['scanned']} dossiers, "
+                             f"ignoré: {counts['skipped']} MRXS)")
+    
+    def _add_slides(self, paths):
+        """Insère les lames absentes dans la liste triée et l'arborescence, retourne les ajouts"""
+        added = []
+        for path in paths:
+            index = bisect.bisect_left(self.zarr_files, path)
+            if index < len(self.zarr_files) and self.zarr_files[index] == path:
+                continue
+            self.zarr_files.insert(index, path)
+            if self.tree_query is None:
+                self._insert_tree_path(path)
+            added.append(path)
+        return added
+    
+    def _remove_slide(self, path):
+        """Retire une lame disparue de la liste, de l'arborescence et des vignettes"""
+        index = bisect.bisect_left(self.zarr_files, path)
+        if index < len(self.zarr_files) and self.zarr_files[index] == path:
+            del self.zarr_files[index]
+        if self.tree_query is None:
+            self._remove_tree_path(path)
+        self.thumbnails.pop(str(path), None)
+        self.slide_info.pop(path, None)
+        if str(path) in self.thumb_pending:
+            self.thumb_pending.discard(str(path))
+            self._update_thumbnail_progress()
+    
+    def _on_slides_changed(self, refreshed, removed=False):
+        """Met à jour le compteur et la grille après ajout/suppression de lames.
         
-        self.zarr_files = sorted(set(self.zarr_files))
+        refreshed: lames dont la vignette est à (re)générer; seules ces vignettes sont demandées.
+        """
+        if not refreshed and not removed:
+            return
         self.file_count_label.config(text=f"{len(self.zarr_files)} fichier(s)")
-        
-        if self.zarr_files:
-            zip_info = f", {zip_count} ZIP" if zip_count > 0 else ""
-            self._set_status(f"{len(self.zarr_files)} OME-Zarr trouvé(s){zip_info} (scanné: {scanned_count}, ignoré: {skipped_count} MRXS)")
-        else:
-            self._set_status(f"Aucun OME-Zarr trouvé (scanné: {scanned_count} dossiers, ignoré: {skipped_count} MRXS)")
+        if self.tree_query is not None:
+            self._populate_file_tree()  # Liste triée/filtrée: requête réexécutée
+        if self.view_mode.get() != "thumbnails":
+            return
+        # Les indices ont changé: seules les cellules visibles sont replacées
+        self._layout_thumbnails()
+        for path in refreshed:
+            path_str = str(path)
+            if path_str in self.thumbnails or path_str in self.thumb_pending:
+                continue
+            self.thumb_pending.add(path_str)
+            self.thumb_total += 1
+            index = bisect.bisect_left(self.zarr_files, path)
+            self._generate_thumbnail_async(path, index // self.thumb_cols)
+        self._update_thumbnail_progress()
+    
+    def _poll_root_folder(self):
+        """Rescan incrémental périodique: les lames d'une acquisition en cours apparaissent seules"""
+        if self.root_folder and not self.scan_running:
+            self._scan_zarr_files(incremental=True)
+        self.root.after(FOLDER_POLL_SECONDS * 1000, self._poll_root_folder)
     
     def _populate_file_tree(self):
         """Remplit l'arborescence des fichiers"""
         self.file_tree.delete(*self.file_tree.get_children())
+        self.tree_folders = {}
+        self.tree_child_names = {}
+        self.tree_items = {}
         
-        if not self.root_folder or not self.zarr_files:
+        if not self.root_folder:
             return
         
-        # Organise par sous-dossiers
-        tree_structure = {}
-        
-        for zarr_path in self.zarr_files:
-            try:
-                rel_path = zarr_path.relative_to(self.root_folder)
-                parts = rel_path.parts
-            except ValueError:
-                parts = (zarr_path.name,)
-            
-            # Construit la hiérarchie
-            current = tree_structure
-            for part in parts[:-1]:
-                if part not in current:
-                    current[part] = {"__children__": {}}
-                current = current[part]["__children__"]
-            
-            # Feuille = chemin complet
-            current[parts[-1]] = str(zarr_path)
+        if self.tree_query is None:
+            for zarr_path in self.zarr_files:
+                self._insert_tree_path(zarr_path)
+            return
         
-        def insert_tree(parent, structure):
-            for name, value in sorted(structure.items()):
-                if name == "__children__":
-                    continue
-                if isinstance(value, dict):
-                    # Dossier
-                    node = self.file_tree.insert(parent, 'end', text=f"📁 {name}", open=True)
-                    if "__children__" in value:
-                        insert_tree(node, value["__children__"])
-                else:
-                    # Fichier zarr (dossier ou ZIP)
-                    path_obj = Path(value)
-                    if path_obj.suffix == '.zip':
-                        # Fichier ZIP
-                        display_name = name.replace('.ome.zarr.zip', '').replace('.zarr.zip', '').replace('.zip', '')
-                        self.file_tree.insert(parent, 'end', text=f"📦 {display_name}", values=(value,))
-                    else:
-                        # Dossier zarr
-                        display_name = name.replace('.ome.zarr', '').replace('.zarr', '')
-                        self.file_tree.insert(parent, 'end', text=f"🔬 {display_name}", values=(value,))
+        # Liste à plat triée/filtrée par le catalogue (lames pas encore cataloguées exclues)
+        try:
+            paths = self.catalog.query(self.root_folder, *self.tree_query)
+        except sqlite3.Error as e:
+            print(f"Erreur requête du catalogue {self.catalog.path}: {e}")
+            paths = self.zarr_files
+        listed = set(self.zarr_files)
+        for zarr_path in paths:
+            if zarr_path in listed:
+                text = self._tree_leaf_text(zarr_path, "/".join(self._tree_parts(zarr_path)))
+                self.tree_items[zarr_path] = self.file_tree.insert(
+                    "", 'end', text=text, values=(str(zarr_path), self._slide_info_text(zarr_path)))
+    
+    def _apply_tree_query(self):
+        """Applique tri et filtre: arborescence par nom par défaut, sinon liste à plat du catalogue"""
+        sort, descending, text = self.sort_var.get(), self.sort_desc.get(), self.filter_var.get().strip()
+        query = None if (sort, descending, text) == ("Nom", False, "") else (sort, descending, text)
+        if query is None and self.tree_query is None:
+            return
+        self.tree_query = query
+        self._populate_file_tree()
+    
+    @staticmethod
+    def _tree_leaf_text(zarr_path, name):
+        """Libellé d'une lame dans la liste (icône + nom sans extension)"""
+        if zarr_path.suffix == '.zip':
+            return "📦 " + name.replace('.ome.zarr.zip', '').replace('.zarr.zip', '').replace('.zip', '')
+        return "🔬 " + name.replace('.ome.zarr', '').replace('.zarr', '')
+    
+    def _slide_info_text(self, zarr_path):
+        """Colonne d'information: dimensions, niveaux, annotations (vide si pas encore catalogué)"""
+        row = self.slide_info.get(zarr_path)
+        if not row or row.get("levels") is None:
+            return ""
+        if not row["levels"]:
+            return "illisible"
+        text = f"{row['width']}×{row['height']} · {row['levels']} niv."
+        if row.get("annotations"):
+            text += f" · {row['annotations']} annot."
+        return text
+    
+    def _update_tree_info(self, zarr_path):
+        """Met à jour la colonne d'information d'une lame affichée"""
+        item = self.tree_items.get(zarr_path)
+        if item is not None:
+            self.file_tree.set(item, "info", self._slide_info_text(zarr_path))
+    
+    def _tree_parts(self, zarr_path):
+        """Chemin d'une lame relatif au dossier racine, découpé en parties"""
+        try:
+            return zarr_path.relative_to(self.root_folder).parts
+        except ValueError:
+            return (zarr_path.name,)
+    
+    def _insert_tree_path(self, zarr_path):
+        """Insère une lame dans l'arborescence (dossiers créés au besoin, ordre alphabétique conservé)"""
+        parts = self._tree_parts(zarr_path)
+        
+        def insert(parent, name, **kwargs):
+            siblings = self.tree_child_names.setdefault(parent, [])
+            index = bisect.bisect_left(siblings, name)
+            siblings.insert(index, name)
+            return self.file_tree.insert(parent, index, **kwargs)
+        
+        # Dossiers intermédiaires
+        parent = ""
+        for depth, part in enumerate(parts[:-1]):
+            key = parts[:depth + 1]
+            if key not in self.tree_folders:
+                self.tree_folders[key] = insert(parent, part, text=f"📁 {part}", open=True)
+            parent = self.tree_folders[key]
+        
+        # Feuille = fichier zarr (dossier ou ZIP)
+        name = parts[-1]
+        self.tree_items[zarr_path] = insert(parent, name, text=self._tree_leaf_text(zarr_path, name),
+                                            values=(str(zarr_path), self._slide_info_text(zarr_path)))
+    
+    def _remove_tree_path(self, zarr_path):
+        """Retire une lame de l'arborescence, ainsi que les dossiers devenus vides"""
+        item = self.tree_items.pop(zarr_path, None)
+        if item is None:
+            return
+        parts = self._tree_parts(zarr_path)
+        self.file_tree.delete(item)
+        self.tree_child_names[self.tree_folders.get(parts[:-1], "")].remove(parts[-1])
         
-        insert_tree("", tree_structure)
+        for depth in range(len(parts) - 1, 0, -1):
+            folder = self.tree_folders[parts[:depth]]
+            if self.tree_child_names.get(folder):
+                break
+            self.file_tree.delete(folder)
+            del self.tree_folders[parts[:depth]]
+            self.tree_child_names.pop(folder, None)
+            self.tree_child_names[self.tree_folders.get(parts[:depth - 1], "")].remove(parts[depth - 1])
     
     def _set_view_mode(self, mode):
         """Change le mode d'affichage (list ou thumbnails)"""
@@ -470,171 +2068,311 @@ class OMEZarrViewer:
             self.thumb_btn.state(['pressed'])
             self._populate_thumbnails()
     
-    def _on_thumb_frame_configure(self, event):
-        """Met à jour la zone de scroll du canvas"""
-        self.thumb_canvas.configure(scrollregion=self.thumb_canvas.bbox("all"))
-    
     def _on_thumb_canvas_configure(self, event):
-        """Ajuste la largeur du frame interne"""
-        self.thumb_canvas.itemconfig(self.thumb_canvas_window, width=event.width)
-        # Recalculer les colonnes si nécessaire
-        if self.view_mode.get() == "thumbnails" and self.zarr_files:
-            self._populate_thumbnails()
+        """Redimensionnement: recalcule la disposition sans recréer les vignettes"""
+        if self.view_mode.get() == "thumbnails":
+            self._layout_thumbnails()
     
     def _on_thumb_mousewheel(self, event):
         """Gère le scroll molette sur le canvas des thumbnails"""
         self.thumb_canvas.yview_scroll(int(-1 * (event.delta / 120)), "units")
     
+    def _on_thumb_scroll(self, first, last):
+        """Suit le défilement des vignettes: scrollbar, cellules visibles et priorités"""
+        self.thumb_scrollbar.set(first, last)
+        self._update_visible_thumbnails()
+        self._reprioritize_thumbnails()
+    
+    def _thumb_cell_size(self):
+        """Taille (w, h) d'une cellule de la grille: vignette + marges + nom"""
+        return self.thumbnail_size + 20, self.thumbnail_size + 30
+    
+    def _thumbnail_priority(self, row):
+        """Priorité de génération: lignes visibles d'abord, puis par distance à la vue"""
+        first, last = self.thumb_canvas.yview()
+        rows = max(1, self.thumb_rows)
+        top, bottom = int(first * rows), int(np.ceil(last * rows))
+        if top <= row < bottom:
+            return (0, row)
+        return (1, min(abs(row - top), abs(row - bottom)))
+    
+    def _reprioritize_thumbnails(self):
+        """Remonte en tête de file les vignettes en attente devenues visibles"""
+        for index, cell in self.thumb_cells.items():
+            if cell["path"] in self.thumb_pending:
+                self._generate_thumbnail_async(Path(cell["path"]), index // self.thumb_cols)
+    
     def _populate_thumbnails(self):
-        """Remplit le canvas avec les thumbnails"""
-        # Vider les anciens widgets
-        for widget in self.thumb_inner.winfo_children():
-            widget.destroy()
+        """Remplit la grille des thumbnails et lance la génération des vignettes manquantes"""
+        # Annuler les générations en attente
+        self.thumb_loader.clear()
+        self.thumb_pending = set()
         
-        if not self.zarr_files:
-            return
+        self._layout_thumbnails()
+        
+        for index, zarr_path in enumerate(self.zarr_files):
+            if str(zarr_path) not in self.thumbnails:
+                self.thumb_pending.add(str(zarr_path))
+                self._generate_thumbnail_async(zarr_path, index // self.thumb_cols)
         
+        self.thumb_total = len(self.thumb_pending)
+        self._update_thumbnail_progress()
+    
+    def _layout_thumbnails(self):
+        """Calcule colonnes et zone de défilement, puis replace les cellules visibles"""
         # Calculer le nombre de colonnes
         canvas_width = self.thumb_canvas.winfo_width()
         if canvas_width < 50:
             canvas_width = 250
-        cols = max(1, canvas_width // (self.thumbnail_size + 20))
+        cell_w, cell_h = self._thumb_cell_size()
+        self.thumb_cols = max(1, canvas_width // cell_w)
+        self.thumb_rows = -(-len(self.zarr_files) // self.thumb_cols)
         
-        row = 0
-        col = 0
+        self.thumb_canvas.configure(scrollregion=(0, 0, self.thumb_cols * cell_w, self.thumb_rows * cell_h))
         
-        for zarr_path in self.zarr_files:
-            # Créer un frame pour chaque thumbnail
-            thumb_widget = self._create_thumbnail_widget(zarr_path, row, col)
-            
-            col += 1
-            if col >= cols:
-                col = 0
-                row += 1
-        
-        # Forcer la mise à jour du scroll
-        self.thumb_inner.update_idletasks()
-        self.thumb_canvas.configure(scrollregion=self.thumb_canvas.bbox("all"))
-    
-    def _create_thumbnail_widget(self, zarr_path, row, col):
-        """Crée un widget thumbnail pour un fichier zarr"""
-        frame = ttk.Frame(self.thumb_inner, padding=5)
-        frame.grid(row=row, column=col, padx=5, pady=5, sticky="n")
-        
-        # Binding scroll molette pour propager au canvas parent
-        def bind_mousewheel(widget):
-            widget.bind("<MouseWheel>", self._on_thumb_mousewheel)
-            widget.bind("<Button-4>", lambda e: self.thumb_canvas.yview_scroll(-1, "units"))
-            widget.bind("<Button-5>", lambda e: self.thumb_canvas.yview_scroll(1, "units"))
-        
-        bind_mousewheel(frame)
-        
-        # Générer ou récupérer le thumbnail
-        path_str = str(zarr_path)
-        
-        if path_str not in self.thumbnails:
-            # Générer le thumbnail en arrière-plan
-            self._generate_thumbnail_async(zarr_path, frame)
-            # Placeholder en attendant
-            placeholder = tk.Canvas(frame, width=self.thumbnail_size, height=self.thumbnail_size, 
-                                   bg="#3a3a4a", highlightthickness=1, highlightbackground="#555")
-            placeholder.create_text(self.thumbnail_size//2, self.thumbnail_size//2, 
-                                   text="⏳", fill="white", font=("Arial", 20))
-            placeholder.pack()
-            placeholder.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
-            bind_mousewheel(placeholder)
+        # Les positions changent: toutes les cellules sont réattribuées
+        for index in list(self.thumb_cells):
+            self._release_thumb_cell(self.thumb_cells.pop(index))
+        self._update_visible_thumbnails()
+    
+    def _update_visible_thumbnails(self):
+        """Matérialise les cellules des lignes visibles (± une ligne), recycle les autres"""
+        wanted = set()
+        if self.zarr_files:
+            cell_w, cell_h = self._thumb_cell_size()
+            top = self.thumb_canvas.canvasy(0)
+            bottom = self.thumb_canvas.canvasy(max(self.thumb_canvas.winfo_height(), cell_h))
+            first_row = max(0, int(top // cell_h) - 1)
+            last_row = min(self.thumb_rows - 1, int(bottom // cell_h) + 1)
+            wanted = set(range(first_row * self.thumb_cols,
+                               min(len(self.zarr_files), (last_row + 1) * self.thumb_cols)))
+        
+        for index in list(self.thumb_cells):
+            if index not in wanted:
+                self._release_thumb_cell(self.thumb_cells.pop(index))
+        
+        for index in sorted(wanted):
+            if index not in self.thumb_cells:
+                self.thumb_cells[index] = self._acquire_thumb_cell(index)
+    
+    def _acquire_thumb_cell(self, index):
+        """Retourne une cellule (items du canvas) affichant la lame d'indice index"""
+        if self.thumb_cell_pool:
+            cell = self.thumb_cell_pool.pop()
         else:
-            # Afficher le thumbnail existant
-            thumb_label = ttk.Label(frame, image=self.thumbnails[path_str])
-            thumb_label.image = self.thumbnails[path_str]  # Garder référence
-            thumb_label.pack()
-            thumb_label.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
-            bind_mousewheel(thumb_label)
+            size = self.thumbnail_size
+            cell = {
+                "bg": self.thumb_canvas.create_rectangle(0, 0, size, size, fill="#3a3a4a", outline="#555"),
+                "wait": self.thumb_canvas.create_text(0, 0, text="⏳", fill="white", font=("Arial", 20)),
+                "image": self.thumb_canvas.create_image(0, 0, anchor=tk.NW),
+                "name": self.thumb_canvas.create_text(0, 0, anchor=tk.N, fill="#dddddd",
+                                                      font=("Arial", 8), width=size),
+                "photo": None,
+                "path": None,
+            }
+        
+        zarr_path = self.zarr_files[index]
+        cell["path"] = str(zarr_path)
+        
+        # Position dans la grille
+        cell_w, cell_h = self._thumb_cell_size()
+        size = self.thumbnail_size
+        x = (index % self.thumb_cols) * cell_w + 10
+        y = (index // self.thumb_cols) * cell_h + 5
+        self.thumb_canvas.coords(cell["bg"], x, y, x + size, y + size)
+        self.thumb_canvas.coords(cell["wait"], x + size // 2, y + size // 2)
+        self.thumb_canvas.coords(cell["image"], x, y)
+        self.thumb_canvas.coords(cell["name"], x + size // 2, y + size + 4)
         
         # Nom du fichier
         name = zarr_path.name.replace('.ome.zarr', '').replace('.zarr', '').replace('.zip', '')
         if len(name) > 12:
             name = name[:10] + "…"
+        self.thumb_canvas.itemconfig(cell["name"], text=name, state=tk.NORMAL)
+        self.thumb_canvas.itemconfig(cell["bg"], state=tk.NORMAL)
+        
+        self._show_thumb_image(cell)
+        return cell
+    
+    def _show_thumb_image(self, cell):
+        """Affiche la vignette de la cellule si elle est disponible, sinon le sablier"""
+        thumb = self.thumbnails.get(cell["path"])
+        if thumb is None:
+            self.thumb_canvas.itemconfig(cell["image"], state=tk.HIDDEN)
+            self.thumb_canvas.itemconfig(cell["wait"], state=tk.NORMAL)
+            return
         
-        name_label = ttk.Label(frame, text=name, font=("Arial", 8), wraplength=self.thumbnail_size)
-        name_label.pack()
-        name_label.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
-        bind_mousewheel(name_label)
+        # Un PhotoImage par cellule, réutilisé (les vignettes ont toutes la même taille)
+        if cell["photo"] is None or (cell["photo"].width(), cell["photo"].height()) != thumb.size:
+            cell["photo"] = ImageTk.PhotoImage(thumb)
+        else:
+            cell["photo"].paste(thumb)
+        self.thumb_canvas.itemconfig(cell["image"], image=cell["photo"], state=tk.NORMAL)
+        self.thumb_canvas.itemconfig(cell["wait"], state=tk.HIDDEN)
+    
+    def _release_thumb_cell(self, cell):
+        """Masque une cellule et la remet dans le pool"""
+        for item in ("bg", "wait", "image", "name"):
+            self.thumb_canvas.itemconfig(cell[item], state=tk.HIDDEN)
+        cell["path"] = None
+        self.thumb_cell_pool.append(cell)
+    
+    def _on_thumb_double_click(self, event):
+        """Double-clic sur une vignette: charge la lame correspondante"""
+        cell_w, cell_h = self._thumb_cell_size()
+        col = int(self.thumb_canvas.canvasx(event.x) // cell_w)
+        row = int(self.thumb_canvas.canvasy(event.y) // cell_h)
+        index = row * self.thumb_cols + col
+        if 0 <= col < self.thumb_cols and 0 <= index < len(self.zarr_files):
+            self._load_zarr(str(self.zarr_files[index]))
+    
+    def _generate_thumbnail_async(self, zarr_path, row):
+        """Génère un thumbnail en arrière-plan (pool borné, lignes visibles en priorité)"""
+        self.thumb_loader.submit(
+            str(zarr_path),
+            lambda: self._generate_thumbnail(zarr_path),
+            callback=self._on_thumbnail_generated,
+            priority=self._thumbnail_priority(row),
+        )
+    
+    def _on_thumbnail_generated(self, path_str, thumb_image, error):
+        """Appelé depuis un thread de génération"""
+        if error is not None:
+            print(f"Erreur génération thumbnail {path_str}: {error}")
+        # Mettre à jour l'UI dans le thread principal
+        self.root.after(0, lambda: self._on_thumbnail_ready(path_str, thumb_image))
+    
+    def _on_thumbnail_ready(self, path_str, thumb_image):
+        """Mémorise un thumbnail reçu et l'affiche si sa cellule est matérialisée"""
+        if path_str in self.thumb_pending:
+            self.thumb_pending.discard(path_str)
+            self._update_thumbnail_progress()
+        if thumb_image is None:
+            return
         
-        # Stocker la référence au path
-        frame.zarr_path = path_str
-        frame.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
+        self.thumbnails[path_str] = thumb_image
+        for cell in self.thumb_cells.values():
+            if cell["path"] == path_str:
+                self._show_thumb_image(cell)
+    
+    def _read_thumbnail_data(self, arr):
+        """Lit un niveau pour la vignette, retourne (Y, X) ou (Y, X, C).
+        
+        Si le niveau dépasse largement la taille de la vignette (pyramide arrêtée à 4096 px,
+        image mono-niveau), seule une grille de ~2× la taille de la vignette est lue, en
+        limitant le nombre de chunks décodés (THUMBNAIL_READ_MB): le temps reste borné quelle
+        que soit la profondeur de la pyramide.
+        """
+        shape = arr.shape
+        axis_y, axis_x = self._spatial_axes(shape)
+        img_h, img_w = shape[axis_y], shape[axis_x]
         
-        return frame
+        # Sélection des axes non spatiaux: premier T/Z, tous les canaux
+        if len(shape) == 2:
+            index = [None, None]
+        elif len(shape) == 3:
+            index = [slice(None), None, None] if axis_y == 1 else [None, None, slice(None)]
+        elif len(shape) == 4:
+            index = [0, slice(None), None, None]
+        else:
+            index = [0] * (len(shape) - 3) + [slice(None), None, None]
+        
+        target = 2 * self.thumbnail_size
+        if max(img_h, img_w) <= 2 * target:
+            # Petit niveau: lecture complète
+            index[axis_y] = slice(None)
+            index[axis_x] = slice(None)
+            data = np.asarray(arr[tuple(index)])
+        else:
+            # Nombre max de chunks décodés par axe, d'après le budget de lecture
+            chunk_bytes = int(np.prod(arr.chunks)) * arr.dtype.itemsize
+            max_chunks = max(1, THUMBNAIL_READ_MB * 1024 * 1024 // max(1, chunk_bytes))
+            per_axis = max(1, int(np.sqrt(max_chunks)))
+            
+            step = max(img_h, img_w) / target
+            index[axis_y] = self._thumbnail_sample_indices(img_h, arr.chunks[axis_y],
+                                                           int(np.ceil(img_h / step)), per_axis)
+            index[axis_x] = self._thumbnail_sample_indices(img_w, arr.chunks[axis_x],
+                                                           int(np.ceil(img_w / step)), per_axis)
+            data = np.asarray(arr.oindex[tuple(index)])
+        
+        # Les canaux en dernier
+        channels_first = len(shape) > 3 or axis_y == 1
+        if data.ndim == 3 and channels_first:
+            data = np.moveaxis(data, 0, -1)
+        return data
+    
+    @staticmethod
+    def _thumbnail_sample_indices(size, chunk, n_samples, max_chunks):
+        """Indices régulièrement espacés le long d'un axe, répartis sur au plus max_chunks chunks"""
+        n_samples = max(1, min(size, n_samples))
+        n_chunks = -(-size // chunk)
+        if n_chunks <= max_chunks:
+            return np.unique(np.linspace(0, size - 1, n_samples).astype(np.int64))
+        
+        # Trop de chunks: échantillonne des chunks régulièrement espacés, puis des pixels dans chacun
+        chunk_ids = np.unique(np.linspace(0, n_chunks - 1, max_chunks).round().astype(np.int64))
+        per_chunk = -(-n_samples // len(chunk_ids))
+        indices = []
+        for c in chunk_ids:
+            start, stop = c * chunk, min((c + 1) * chunk, size)
+            indices.append(np.linspace(start, stop - 1, min(per_chunk, stop - start)).astype(np.int64))
+        return np.unique(np.concatenate(indices))
+    
+    def _update_thumbnail_progress(self):
+        """Affiche l'avancement de la génération des vignettes dans la barre de statut"""
+        if not self.thumb_total:
+            return
+        done = self.thumb_total - len(self.thumb_pending)
+        if done < self.thumb_total:
+            self._set_status(f"Vignettes: {done}/{self.thumb_total}")
+        else:
+            self._set_status(f"Vignettes: {self.thumb_total}/{self.thumb_total} générées")
+            self.thumb_total = 0
+    
+    def _thumbnail_cache_path(self, zarr_path):
+        """Chemin du thumbnail sur disque, clé = chemin + taille/mtime de la lame + taille vignette"""
+        size, mtime = _slide_signature(zarr_path)
+        key = f"{Path(zarr_path).resolve()}|{size}|{mtime}|{self.thumbnail_size}"
+        return CACHE_DIR / "thumbnails" / f"{hashlib.sha1(key.encode('utf-8')).hexdigest()}.png"
     
-    def _generate_thumbnail_async(self, zarr_path, frame):
-        """Génère un thumbnail en arrière-plan"""
-        import threading
+    def _generate_thumbnail(self, zarr_path):
+        """Retourne le thumbnail (image PIL): depuis le cache disque s'il est à jour, sinon
+        généré depuis la lame puis enregistré dans le cache"""
+        try:
+            cache_path = self._thumbnail_cache_path(zarr_path)
+        except OSError as e:
+            print(f"Erreur lecture thumbnail {zarr_path}: {e}")
+            return None
         
-        def generate():
+        # Cache valide: aucune ouverture de la lame
+        if cache_path.exists():
             try:
-                thumb_image = self._generate_thumbnail(zarr_path)
-                if thumb_image:
-                    # Mettre à jour l'UI dans le thread principal
-                    self.root.after(0, lambda: self._update_thumbnail_widget(frame, zarr_path, thumb_image))
+                with Image.open(cache_path) as cached:
+                    return cached.convert('RGB')
             except Exception as e:
-                print(f"Erreur génération thumbnail {zarr_path}: {e}")
+                print(f"Thumbnail en cache illisible {cache_path}: {e}")
         
-        threading.Thread(target=generate, daemon=True).start()
+        thumb = self._render_thumbnail(zarr_path)
+        if thumb is not None:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = cache_path.with_name(f"{cache_path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+                thumb.save(tmp_path, format='PNG')
+                os.replace(tmp_path, cache_path)
+            except OSError as e:
+                print(f"Erreur écriture cache thumbnail {cache_path}: {e}")
+        return thumb
     
-    def _generate_thumbnail(self, zarr_path):
+    def _render_thumbnail(self, zarr_path):
         """Génère un thumbnail depuis le niveau le plus bas de la pyramide"""
         try:
-            path_str = str(zarr_path)
-            path_obj = Path(zarr_path)
-            is_zip = path_obj.is_file() and path_obj.suffix.lower() == '.zip'
+            # Niveau le plus bas (disposition en cache partagée avec l'ouverture de la lame)
+            _, levels, _ = _open_pyramid(zarr_path)
+            arr = levels[-1]
             
-            if is_zip:
-                import zipfile
-                # Ouvrir le ZIP et trouver le chemin racine
-                with zipfile.ZipFile(path_str, 'r') as zf:
-                    namelist = zf.namelist()
-                    root_path = ""
-                    for name in namelist:
-                        if name.endswith('zarr.json') or name.endswith('.zgroup') or name.endswith('.zattrs'):
-                            parts = name.replace('\\', '/').split('/')
-                            if len(parts) > 1:
-                                root_path = '/'.join(parts[:-1])
-                            break
-                
-                zip_store = zarr.storage.ZipStore(path_str, mode='r')
-                if root_path:
-                    store = zarr.open_group(zip_store, mode='r', path=root_path)
-                else:
-                    store = zarr.open(zip_store, mode='r')
-            else:
-                store = zarr.open(path_str, mode='r')
-            
-            # Trouver le niveau le plus bas (thumbnail)
-            levels = []
-            for key in store.keys():
-                if key.isdigit():
-                    levels.append(int(key))
-            
-            if not levels:
-                return None
-            
-            max_level = max(levels)
-            arr = store[str(max_level)]
-            
-            # Lire l'image entière du niveau le plus bas
-            shape = arr.shape
-            if len(shape) == 2:
-                data = arr[:]
-                data = np.stack([data]*3, axis=-1)
-            elif len(shape) == 3:
-                if shape[0] <= 4:  # (C, Y, X)
-                    data = np.moveaxis(arr[:], 0, -1)
-                else:  # (Y, X, C)
-                    data = arr[:]
-            else:
-                # (T, C, Y, X) ou similaire
-                data = np.moveaxis(arr[0, :], 0, -1)
+            # Lire le niveau le plus bas (échantillonné s'il reste très grand)
+            data = self._read_thumbnail_data(arr)
             
             # S'assurer qu'on a 3 canaux RGB
             if data.ndim == 2:
@@ -662,48 +2400,17 @@ class OMEZarrViewer:
             y = (self.thumbnail_size - pil_img.height) // 2
             thumb.paste(pil_img, (x, y))
             
-            # Convertir en PhotoImage
-            photo = ImageTk.PhotoImage(thumb)
-            
-            # Stocker dans le cache
-            self.thumbnails[path_str] = photo
-            
-            return photo
+            return thumb
             
         except Exception as e:
             print(f"Erreur lecture thumbnail {zarr_path}: {e}")
             return None
     
-    def _update_thumbnail_widget(self, frame, zarr_path, thumb_image):
-        """Met à jour le widget thumbnail avec l'image générée"""
-        path_str = str(zarr_path)
-        
-        # Supprimer le placeholder
-        for widget in frame.winfo_children():
-            if isinstance(widget, tk.Canvas):
-                widget.destroy()
-                break
-        
-        # Ajouter le vrai thumbnail
-        thumb_label = ttk.Label(frame, image=thumb_image)
-        thumb_label.image = thumb_image
-        thumb_label.pack(before=frame.winfo_children()[0] if frame.winfo_children() else None)
-        thumb_label.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
-        
-        # Binding scroll molette
-        thumb_label.bind("<MouseWheel>", self._on_thumb_mousewheel)
-        thumb_label.bind("<Button-4>", lambda e: self.thumb_canvas.yview_scroll(-1, "units"))
-        thumb_label.bind("<Button-5>", lambda e: self.thumb_canvas.yview_scroll(1, "units"))
-        thumb_label.bind("<Double-1>", lambda e, p=path_str: self._load_zarr(p))
-    
     def _refresh_file_list(self):
         """Rafraîchit la liste des fichiers"""
         if self.root_folder:
-            self.thumbnails.clear()  # Vider le cache des thumbnails
-            self._scan_zarr_files()
-            self._populate_file_tree()
-            if self.view_mode.get() == "thumbnails":
-                self._populate_thumbnails()
+            # Rescan incrémental: seules les lames ajoutées/supprimées/modifiées sont mises à jour
+            self._scan_zarr_files(incremental=True)
     
     def _debug_folder(self):
         """Affiche le contenu du dossier pour debug"""
@@ -740,7 +2447,7 @@ class OMEZarrViewer:
                     info_lines.append(f"📁 {item.name}{marker_str}")
                 else:
                     # Fichier - vérifier si c'est un ZIP zarr
-                    if item.suffix == '.zip' and 'zarr' in item.name.lower():
+                    if item.suffix.lower() == '.zip' and _probe_zarr_zip(item, {})[1]:
                         info_lines.append(f"📦 {item.name} [ZIP Zarr]")
                     else:
                         info_lines.append(f"📄 {item.name}")
@@ -793,68 +2500,40 @@ class OMEZarrViewer:
     
     def _load_zarr(self, path):
         """Charge un OME-Zarr (structure pyramidale) - supporte dossier ou ZIP"""
+        self.load_started = time.perf_counter()  # Mesure du temps jusqu'à la première image
         self.zarr_path = str(path)
+        self.annotation_load_id += 1  # Abandonne le chargement d'annotations de la lame précédente
         path_obj = Path(path)
         
         # Déterminer si c'est un ZIP
         is_zip = path_obj.is_file() and path_obj.suffix.lower() == '.zip'
         
         if is_zip:
-            # Ouvrir le ZIP et trouver le chemin racine du zarr
-            import zipfile
-            
-            with zipfile.ZipFile(self.zarr_path, 'r') as zf:
-                namelist = zf.namelist()
-                
-                # Trouver le chemin racine (chercher zarr.json, .zgroup, ou .zattrs)
-                root_path = ""
-                for name in namelist:
-                    if name.endswith('zarr.json') or name.endswith('.zgroup') or name.endswith('.zattrs'):
-                        # Extraire le chemin parent
-                        parts = name.replace('\\', '/').split('/')
-                        if len(parts) > 1:
-                            root_path = '/'.join(parts[:-1])
-                        break
-                
-                # Si pas trouvé, chercher un dossier "0" (niveau pyramidal)
-                if not root_path:
-                    for name in namelist:
-                        parts = name.replace('\\', '/').split('/')
-                        if '0' in parts:
-                            idx = parts.index('0')
-                            if idx > 0:
-                                root_path = '/'.join(parts[:idx])
-                            break
-            
-            # Créer le store ZIP avec le bon chemin
-            zip_store = zarr.storage.ZipStore(self.zarr_path, mode='r')
-            
-            if root_path:
-                self._set_status(f"ZIP: racine trouvée à '{root_path}'")
-                # Utiliser un chemin dans le store
-                self.zarr_store = zarr.open_group(zip_store, mode='r', path=root_path)
-            else:
-                self.zarr_store = zarr.open(zip_store, mode='r')
-        else:
-            self.zarr_store = zarr.open(self.zarr_path, mode='r')
+            # Index de l'archive (table centrale analysée une fois, partagée avec annotations et vignettes)
+            zip_index = _get_zip_index(self.zarr_path)
+            if zip_index.root:
+                self._set_status(f"ZIP: racine trouvée à '{zip_index.root}'")
         
-        self.pyramid = []
+        # Groupe et niveaux de résolution (disposition en cache ou métadonnées consolidées si possible)
+        self.zarr_store, self.pyramid, source = _open_pyramid(self.zarr_path)
+        self.load_timings = {"metadata": (time.perf_counter() - self.load_started) * 1000, "source": source}
         
         # Vide le cache pour le nouveau fichier
+        if self.tile_cache.cache:
+            self._log_cache_stats()
         self.tile_cache.clear()
-        
-        # Détecte les niveaux de résolution (0, 1, 2, ...)
-        level = 0
-        while str(level) in self.zarr_store:
-            arr = self.zarr_store[str(level)]
-            self.pyramid.append(arr)
-            level += 1
-        
-        if not self.pyramid:
-            if isinstance(self.zarr_store, zarr.Array):
-                self.pyramid = [self.zarr_store]
-            else:
-                raise ValueError("Structure OME-Zarr non reconnue")
+        self.tile_cache.reset_stats()
+        self.overlay_cache.clear()
+        self.overlay_cache.reset_stats()
+        self.tile_loader.clear()
+        self._clear_tile_items()
+        self.prefetched_keys.clear()
+        self.prefetch_stats = {"issued": 0, "loaded": 0, "used": 0}
+        self.tile_sizes = {}
+        
+        self.overview = None
+        self.display_max = None  # Calculé en arrière-plan (avec l'aperçu ou sur un échantillon)
+        self.overview_pending = self._load_overview()
         
         # Config UI
         self.level_combo['values'] = list(range(len(self.pyramid)))
@@ -862,7 +2541,7 @@ class OMEZarrViewer:
         # Démarre au niveau le plus bas (vue d'ensemble) puis centre
         start_level = len(self.pyramid) - 1
         self.level_combo.current(start_level)
-        self.current_level = start_level
+        self._set_zoom(self._level_zoom(start_level))
         
         # Centre la vue
         self._center_view()
@@ -877,19 +2556,45 @@ class OMEZarrViewer:
         # Charger les annotations
         self._load_annotations()
         
-        self._render()
+        self._request_render()
     
     def _get_image_size(self, level):
         """Retourne (height, width) pour un niveau"""
-        shape = self.pyramid[level].shape
-        if len(shape) == 2:
-            return shape[0], shape[1]
-        elif len(shape) == 3:
-            if shape[0] <= 4:
-                return shape[1], shape[2]
-            return shape[0], shape[1]
-        else:
-            return shape[-2], shape[-1]
+        return _shape_layout(self.pyramid[level].shape)[:2]
+    
+    def _level_zoom(self, level):
+        """Zoom (pixels écran par pixel du niveau 0) affichant un niveau à 1:1"""
+        return self._get_image_size(level)[1] / self._get_image_size(0)[1]
+    
+    def _get_display_size(self):
+        """Retourne (height, width) de l'image affichée au zoom courant"""
+        h0, w0 = self._get_image_size(0)
+        return h0 * self.zoom, w0 * self.zoom
+    
+    def _get_level_scale(self, level):
+        """Retourne (sy, sx): pixels écran par pixel du niveau au zoom courant"""
+        h0, w0 = self._get_image_size(0)
+        h, w = self._get_image_size(level)
+        return self.zoom * h0 / h, self.zoom * w0 / w
+    
+    def _best_level(self, zoom):
+        """Niveau le moins coûteux dont la résolution reste ≥ à celle de l'affichage"""
+        for level in range(len(self.pyramid) - 1, -1, -1):
+            if self._level_zoom(level) >= zoom * (1 - 1e-6):
+                return level
+        return 0
+    
+    def _zoom_limits(self):
+        """Zoom (min, max): min = niveau le plus bas ou image entière dans la vue"""
+        h0, w0 = self._get_image_size(0)
+        fit = min(self.canvas_width / w0, self.canvas_height / h0)
+        return min(self._level_zoom(len(self.pyramid) - 1), fit), MAX_ZOOM
+    
+    def _set_zoom(self, zoom):
+        """Change le zoom et le niveau source correspondant"""
+        self.zoom = zoom
+        self.current_level = self._best_level(zoom)
+        self.level_var.set(str(self.current_level))
     
     def _center_view(self):
         """Centre la vue sur l'image"""
@@ -903,7 +2608,7 @@ class OMEZarrViewer:
             self.canvas_width = 800
             self.canvas_height = 600
         
-        h, w = self._get_image_size(self.current_level)
+        h, w = self._get_display_size()
         
         # Centre l'image
         self.view_x = (w - self.canvas_width) / 2
@@ -912,14 +2617,14 @@ class OMEZarrViewer:
         # Clamp aux bords
         self._clamp_view()
         
-        self._render()
+        self._request_render()
     
     def _clamp_view(self):
         """Contraint la vue pour rester dans l'image"""
         if not self.pyramid:
             return
         
-        h, w = self._get_image_size(self.current_level)
+        h, w = self._get_display_size()
         
         # Limites maximales
         max_x = max(0, w - self.canvas_width)
@@ -936,93 +2641,438 @@ class OMEZarrViewer:
         else:
             self.view_y = max(0, min(self.view_y, max_y))
     
-    def _get_tile(self, level, x, y, width, height):
-        """Extrait une région de l'image avec cache"""
-        # Clé de cache
-        cache_key = (self.zarr_path, level, x, y, width, height)
-        cached = self.tile_cache.get(cache_key)
-        if cached is not None:
-            return cached
-        
+    @staticmethod
+    def _spatial_axes(shape):
+        """Retourne les indices des axes (Y, X) selon la disposition du tableau"""
+        if len(shape) == 2:
+            return 0, 1
+        elif len(shape) == 3:
+            if shape[0] <= 4:  # (C, Y, X)
+                return 1, 2
+            return 0, 1
+        else:
+            return len(shape) - 2, len(shape) - 1
+    
+    def _get_chunk_size(self, level):
+        """Retourne (chunk_h, chunk_w) des axes spatiaux pour un niveau"""
         arr = self.pyramid[level]
+        axis_y, axis_x = self._spatial_axes(arr.shape)
+        return arr.chunks[axis_y], arr.chunks[axis_x]
+    
+    def _get_tile_size(self, level):
+        """Retourne (tile_h, tile_w) de la grille de tuiles, alignée sur les chunks du niveau"""
+        if level in self.tile_sizes:
+            return self.tile_sizes[level]
+        
+        def align(chunk):
+            if chunk >= TILE_MAX_SIZE:
+                # Gros chunks: subdivision régulière du chunk, en parts égales si possible pour
+                # qu'aucune tuile ne chevauche deux chunks
+                parts = -(-chunk // TILE_MAX_SIZE)
+                for n in range(parts, chunk // TILE_MIN_SIZE + 1):
+                    if chunk % n == 0:
+                        return chunk // n
+                return chunk // parts
+            # Petits chunks: regroupe plusieurs chunks par tuile
+            return chunk * max(1, -(-TILE_MIN_SIZE // chunk))
+        
+        chunk_h, chunk_w = self._get_chunk_size(level)
+        size = (align(chunk_h), align(chunk_w))
+        self.tile_sizes[level] = size
+        return size
+    
+    @staticmethod
+    def _read_region(arr, y0, y1, x0, x1):
+        """Lit une région [y0:y1, x0:x1] d'un tableau zarr, retourne (H, W) ou (H, W, C)"""
         shape = arr.shape
-        img_h, img_w = self._get_image_size(level)
-        
-        # Gère les coordonnées négatives (image plus petite que canvas)
-        pad_left = max(0, -x)
-        pad_top = max(0, -y)
-        
-        # Ajuste les coordonnées de lecture
-        read_x = max(0, x)
-        read_y = max(0, y)
-        read_w = min(width - pad_left, img_w - read_x)
-        read_h = min(height - pad_top, img_h - read_y)
-        
-        if read_w <= 0 or read_h <= 0:
-            # Retourne une image noire si hors limites
-            return np.zeros((height, width, 3), dtype=np.uint8)
         
         # Lecture selon le format
         if len(shape) == 2:
-            tile = arr[read_y:read_y+read_h, read_x:read_x+read_w]
+            region = arr[y0:y1, x0:x1]
         elif len(shape) == 3:
             if shape[0] <= 4:  # (C, Y, X)
-                tile = arr[:, read_y:read_y+read_h, read_x:read_x+read_w]
-                tile = np.moveaxis(tile, 0, -1)
+                region = np.moveaxis(arr[:, y0:y1, x0:x1], 0, -1)
             else:  # (Y, X, C)
-                tile = arr[read_y:read_y+read_h, read_x:read_x+read_w, :]
+                region = arr[y0:y1, x0:x1, :]
         elif len(shape) >= 4:
             if len(shape) == 4:
-                tile = arr[0, :, read_y:read_y+read_h, read_x:read_x+read_w]
+                region = arr[0, :, y0:y1, x0:x1]
             else:
-                tile = arr[0, 0, :, read_y:read_y+read_h, read_x:read_x+read_w]
-            tile = np.moveaxis(tile, 0, -1)
+                region = arr[0, 0, :, y0:y1, x0:x1]
+            region = np.moveaxis(region, 0, -1)
         else:
             raise ValueError(f"Format non supporté: {shape}")
         
-        tile = np.array(tile)
+        return np.ascontiguousarray(region)
+    
+    def _load_grid_tile(self, cache_key, arr, y0, y1, x0, x1, chunk_region=None, siblings=()):
+        """Lit une tuile de la grille (thread de chargement) et la met en cache.
+        
+        Tuile plus petite qu'un chunk: chunk_region (y0, y1, x0, x1) couvre les chunks entiers qu'elle
+        touche, décodés une seule fois; siblings [(ty, tx, y0, y1, x0, x1)] liste les tuiles qu'ils
+        contiennent, toutes mises en cache. Les tuiles voisines lues en parallèle attendent ce
+        décodage au lieu de le refaire.
+        """
+        if chunk_region is None:
+            tile = self._read_region(arr, y0, y1, x0, x1)
+            # Ignore les tuiles d'une lame fermée entre-temps
+            if cache_key[0] == self.zarr_path:
+                self.tile_cache.put(cache_key, tile)
+            return tile
+        
+        path, level = cache_key[:2]
+        with self.chunk_locks[hash((path, level) + chunk_region) % len(self.chunk_locks)]:
+            tile = self.tile_cache.get(cache_key, record_stats=False)
+            if tile is not None:
+                return tile  # Décodée entre-temps avec une tuile voisine
+            ry0, ry1, rx0, rx1 = chunk_region
+            region = self._read_region(arr, ry0, ry1, rx0, rx1)
+            for ty, tx, sy0, sy1, sx0, sx1 in siblings:
+                key = (path, level, ty, tx)
+                if key != cache_key and key in self.tile_cache:
+                    continue
+                sub = np.ascontiguousarray(region[sy0 - ry0:sy1 - ry0, sx0 - rx0:sx1 - rx0])
+                if key == cache_key:
+                    tile = sub
+                if path == self.zarr_path:
+                    self.tile_cache.put(key, sub)
+        return tile
+    
+    def _request_grid_tile(self, level, ty, tx, priority, callback=None):
+        """Demande le chargement asynchrone de la tuile (ty, tx) d'un niveau.
         
-        # Crée l'image finale avec padding si nécessaire
-        if pad_left > 0 or pad_top > 0 or tile.shape[0] < height or tile.shape[1] < width:
-            if len(tile.shape) == 2:
-                full_tile = np.zeros((height, width), dtype=tile.dtype)
-                full_tile[pad_top:pad_top+tile.shape[0], pad_left:pad_left+tile.shape[1]] = tile
-            else:
-                full_tile = np.zeros((height, width, tile.shape[2]), dtype=tile.dtype)
-                full_tile[pad_top:pad_top+tile.shape[0], pad_left:pad_left+tile.shape[1], :] = tile
-            tile = full_tile
+        Retourne True si la tuile n'était pas déjà demandée.
+        """
+        cache_key = (self.zarr_path, level, ty, tx)
+        tile_h, tile_w = self._get_tile_size(level)
+        img_h, img_w = self._get_image_size(level)
+        y0 = ty * tile_h
+        x0 = tx * tile_w
+        y1 = min(y0 + tile_h, img_h)
+        x1 = min(x0 + tile_w, img_w)
+        arr = self.pyramid[level]
         
-        self.tile_cache.put(cache_key, tile)
-        return tile
+        # Tuile plus petite qu'un chunk: lecture des chunks entiers, partagée avec les tuiles voisines
+        chunk_region, siblings = None, []
+        chunk_h, chunk_w = self._get_chunk_size(level)
+        if tile_h < chunk_h or tile_w < chunk_w:
+            ry0, rx0 = y0 // chunk_h * chunk_h, x0 // chunk_w * chunk_w
+            ry1 = min(-(-y1 // chunk_h) * chunk_h, img_h)
+            rx1 = min(-(-x1 // chunk_w) * chunk_w, img_w)
+            chunk_region = (ry0, ry1, rx0, rx1)
+            for sty in range(-(-ry0 // tile_h), ry1 // tile_h + 1):
+                sy0, sy1 = sty * tile_h, min((sty + 1) * tile_h, img_h)
+                if sy0 >= sy1 or sy1 > ry1:
+                    continue
+                for stx in range(-(-rx0 // tile_w), rx1 // tile_w + 1):
+                    sx0, sx1 = stx * tile_w, min((stx + 1) * tile_w, img_w)
+                    if sx0 < sx1 <= rx1:
+                        siblings.append((sty, stx, sy0, sy1, sx0, sx1))
+        
+        return self.tile_loader.submit(
+            cache_key,
+            lambda: self._load_grid_tile(cache_key, arr, y0, y1, x0, x1, chunk_region, siblings),
+            callback=callback or self._on_tile_loaded,
+            priority=priority,
+            generation=self.tile_generation,
+        )
     
-    def _render(self):
-        """Rendu de l'image"""
-        if not self.pyramid:
+    def _on_tile_loaded(self, cache_key, tile, error):
+        """Appelé depuis un thread de chargement quand une tuile est prête"""
+        if error is not None:
+            print(f"Erreur lecture tuile {cache_key}: {error}")
             return
+        if cache_key[0] == self.zarr_path:
+            self.root.after(0, self._request_render)
+    
+    def _on_prefetch_loaded(self, cache_key, tile, error):
+        """Appelé depuis un thread de chargement quand une tuile préchargée est prête"""
+        if error is None:
+            self.root.after(0, lambda: self._record_prefetched(cache_key))
+    
+    def _record_prefetched(self, cache_key):
+        """Comptabilise une tuile préchargée (thread Tk) et redessine si la vue l'attend.
         
-        # Dimensions canvas
-        self.canvas_width = self.canvas.winfo_width()
-        self.canvas_height = self.canvas.winfo_height()
-        if self.canvas_width < 10:
-            self.canvas_width = 800
-            self.canvas_height = 600
+        Une tuile devenue visible pendant sa lecture n'a pas été redemandée (demande déjà
+        en cours): sans ce rendu, l'aperçu grossier resterait affiché.
+        """
+        if cache_key[0] != self.zarr_path:
+            return
+        self.prefetched_keys[cache_key] = None
+        self.prefetch_stats["loaded"] += 1
+        while len(self.prefetched_keys) > PREFETCH_MAX_KEYS:
+            del self.prefetched_keys[next(iter(self.prefetched_keys))]
+        if self.missing_tiles:
+            self._request_render()
+    
+    def _prefetch_region(self, level, x, y, width, height, priority_class, budget):
+        """Précharge les tuiles d'une région absentes du cache, dans la limite d'un budget (octets).
         
-        # Contraint la position
-        self._clamp_view()
+        Retourne le budget restant.
+        """
+        img_h, img_w = self._get_image_size(level)
+        x0, y0 = max(0, int(x)), max(0, int(y))
+        x1, y1 = min(int(x + width), img_w), min(int(y + height), img_h)
+        if x1 <= x0 or y1 <= y0:
+            return budget
+        
+        tile_h, tile_w = self._get_tile_size(level)
+        dtype, channels = self._get_tile_shape_info(level)
+        tile_bytes = tile_h * tile_w * int(np.prod(channels)) * dtype.itemsize
+        center_x, center_y = (x0 + x1) / 2, (y0 + y1) / 2
+        
+        for ty in range(y0 // tile_h, (y1 - 1) // tile_h + 1):
+            for tx in range(x0 // tile_w, (x1 - 1) // tile_w + 1):
+                if budget < tile_bytes:
+                    return budget
+                if self._is_tile_available(level, ty, tx):
+                    continue
+                dist = abs((tx + 0.5) * tile_w - center_x) + abs((ty + 0.5) * tile_h - center_y)
+                if self._request_grid_tile(level, ty, tx, priority=(priority_class, dist),
+                                           callback=self._on_prefetch_loaded):
+                    self.prefetch_stats["issued"] += 1
+                budget -= tile_bytes
+        return budget
+    
+    def _prefetch(self):
+        """Précharge en priorité basse les tuiles probables du prochain rendu.
+        
+        - Déplacement: la vue décalée dans la direction et à la vitesse du glisser
+        - Zoom: la région sous la souris aux niveaux voisins (niveau courant ± 1)
+        """
+        budget = self.tile_cache.max_bytes * PREFETCH_BUDGET_FRACTION
+        
+        # Anticipation du déplacement (bornée à une largeur de vue)
+        vx, vy = self.pan_velocity
+        if abs(vx) > 1 or abs(vy) > 1:
+            ahead_x = max(-self.canvas_width, min(self.canvas_width, vx * PREFETCH_LOOKAHEAD))
+            ahead_y = max(-self.canvas_height, min(self.canvas_height, vy * PREFETCH_LOOKAHEAD))
+            sy, sx = self._get_level_scale(self.current_level)
+            budget = self._prefetch_region(self.current_level,
+                                           (self.view_x + ahead_x) / sx, (self.view_y + ahead_y) / sy,
+                                           self.canvas_width / sx, self.canvas_height / sy,
+                                           PRIORITY_PREFETCH_PAN, budget)
+        
+        # Niveaux voisins autour de l'ancre de zoom (souris, sinon centre de la vue)
+        anchor_x = self.mouse_x if self.mouse_x is not None else self.canvas_width / 2
+        anchor_y = self.mouse_y if self.mouse_y is not None else self.canvas_height / 2
+        abs_x = (self.view_x + anchor_x) / self.zoom  # Coordonnées niveau 0
+        abs_y = (self.view_y + anchor_y) / self.zoom
+        h0, w0 = self._get_image_size(0)
         
-        # Extrait la tuile
-        tile = self._get_tile(
-            self.current_level,
-            int(self.view_x), int(self.view_y),
-            self.canvas_width, self.canvas_height
-        )
+        for level in (self.current_level - 1, self.current_level + 1):
+            if not 0 <= level < len(self.pyramid):
+                continue
+            # Vue affichant ce niveau à 1:1 avec la même ancre
+            new_h, new_w = self._get_image_size(level)
+            budget = self._prefetch_region(level,
+                                           abs_x * new_w / w0 - anchor_x, abs_y * new_h / h0 - anchor_y,
+                                           self.canvas_width, self.canvas_height,
+                                           PRIORITY_PREFETCH_ZOOM, budget)
+    
+    def _prefetch_summary(self):
+        """Résumé du taux d'utilisation du préchargement"""
+        loaded = self.prefetch_stats["loaded"]
+        if not loaded:
+            return ""
+        return f" | préch. {self.prefetch_stats['used'] / loaded:.0%}"
+    
+    def _get_tile_shape_info(self, level):
+        """Retourne (dtype, shape des canaux) d'une tuile du niveau, sans lecture"""
+        arr = self.pyramid[level]
+        shape = arr.shape
+        if len(shape) == 2:
+            return arr.dtype, ()
+        elif len(shape) == 3:
+            return arr.dtype, (shape[0],) if shape[0] <= 4 else (shape[2],)
+        elif len(shape) == 4:
+            return arr.dtype, (shape[1],)
+        return arr.dtype, (shape[2],)
+    
+    def _request_render(self):
+        """Marque la vue comme à redessiner.
+        
+        Les demandes (glisser, molette, redimensionnement, arrivée de tuiles) sont regroupées:
+        au plus un rendu par intervalle de frame (MAX_FPS), avec l'état de vue le plus récent.
+        """
+        if self._render_scheduled:
+            return
+        self._render_scheduled = True
+        elapsed = time.perf_counter() - self.last_render_time
+        delay_ms = max(0, int((self.frame_interval - elapsed) * 1000))
+        self.root.after(delay_ms, self._do_scheduled_render)
+    
+    def _do_scheduled_render(self):
+        self._render_scheduled = False
+        self._render()
+    
+    def _load_overview(self):
+        """Lance la lecture du niveau le plus bas s'il est assez petit pour rester en mémoire.
+        
+        La lecture passe par le chargeur de tuiles, avant toute tuile visible, pour ne pas
+        bloquer l'interface; l'aperçu est installé par _set_overview. Retourne True si lancée.
+        """
+        level = len(self.pyramid) - 1
+        arr = self.pyramid[level]
+        img_h, img_w = self._get_image_size(level)
+        dtype, channels = self._get_tile_shape_info(level)
+        nbytes = img_h * img_w * int(np.prod(channels)) * dtype.itemsize
+        if nbytes > OVERVIEW_MAX_MB * 1024 * 1024:
+            self._load_display_max()
+            return False
+        
+        def read():
+            overview = self._read_region(arr, 0, img_h, 0, img_w)
+            display_max = None
+            if overview.dtype != np.uint8:
+                display_max = float(overview.max()) if overview.size else 0.0
+            return overview, display_max
+        
+        self.tile_loader.submit((self.zarr_path, "overview"), read,
+                                callback=self._on_overview_loaded,
+                                priority=(PRIORITY_VISIBLE, -1))
+        return True
+    
+    def _on_overview_loaded(self, key, result, error):
+        """Appelé depuis un thread de chargement quand l'aperçu est lu"""
+        if error is not None:
+            print(f"Erreur lecture aperçu {key[0]}: {error}")
+        self.root.after(0, lambda: self._set_overview(key[0], result))
+    
+    def _set_overview(self, path, result):
+        """Installe l'aperçu résident (thread Tk), ou se rabat sur la lecture tuile par tuile"""
+        if path != self.zarr_path or not self.overview_pending:
+            return
+        self.overview_pending = False
+        if result is None:
+            self._load_display_max()
+        else:
+            self.overview, self.display_max = result
+        if self.display_max is not None:
+            self._clear_tile_items()  # Tuiles déjà affichées sans le max commun
+        self._request_render()
+    
+    def _load_display_max(self):
+        """Lance l'estimation du max d'affichage (images non uint8) dans le chargeur de tuiles"""
+        arr = self.pyramid[-1]
+        if arr.dtype == np.uint8:
+            return
+        self.tile_loader.submit((self.zarr_path, "display_max"), lambda: self._compute_display_max(arr),
+                                callback=self._on_display_max_loaded,
+                                priority=(PRIORITY_VISIBLE, -1))
+    
+    def _on_display_max_loaded(self, key, result, error):
+        """Appelé depuis un thread de chargement quand le max d'affichage est estimé"""
+        if error is not None:
+            print(f"Erreur estimation du max d'affichage {key[0]}: {error}")
+        self.root.after(0, lambda: self._set_display_max(key[0], result))
+    
+    def _set_display_max(self, path, display_max):
+        """Installe le max d'affichage commun (thread Tk) et réaffiche les tuiles"""
+        if path != self.zarr_path or display_max is None:
+            return
+        self.display_max = display_max
+        self._clear_tile_items()  # Tuiles déjà affichées sans le max commun
+        self._request_render()
+    
+    def _get_cached_tile(self, level, ty, tx):
+        """Retourne la tuile (ty, tx) si elle est en mémoire (cache ou aperçu résident), sinon None"""
+        if level == len(self.pyramid) - 1 and self.overview is not None:
+            tile_h, tile_w = self._get_tile_size(level)
+            return self.overview[ty * tile_h:(ty + 1) * tile_h, tx * tile_w:(tx + 1) * tile_w]
+        return self.tile_cache.get((self.zarr_path, level, ty, tx))
+    
+    def _is_tile_available(self, level, ty, tx):
+        """Comme _get_cached_tile, sans lecture ni statistiques (aperçu en cours compris)"""
+        if level == len(self.pyramid) - 1 and (self.overview is not None or self.overview_pending):
+            return True
+        return (self.zarr_path, level, ty, tx) in self.tile_cache
+    
+    def _get_cached_region(self, level, x0, y0, x1, y1):
+        """Assemble une région d'un niveau depuis les tuiles en mémoire, ou None s'il en manque"""
+        if level == len(self.pyramid) - 1 and self.overview is not None:
+            return self.overview[y0:y1, x0:x1]
+        
+        tile_h, tile_w = self._get_tile_size(level)
+        tiles = {}
+        for ty in range(y0 // tile_h, (y1 - 1) // tile_h + 1):
+            for tx in range(x0 // tile_w, (x1 - 1) // tile_w + 1):
+                tile = self.tile_cache.get((self.zarr_path, level, ty, tx), record_stats=False)
+                if tile is None:
+                    return None
+                tiles[(ty, tx)] = tile
+        
+        first = next(iter(tiles.values()))
+        region = np.zeros((y1 - y0, x1 - x0) + first.shape[2:], dtype=first.dtype)
+        for (ty, tx), tile in tiles.items():
+            ix0 = max(x0, tx * tile_w)
+            iy0 = max(y0, ty * tile_h)
+            ix1 = min(x1, tx * tile_w + tile.shape[1])
+            iy1 = min(y1, ty * tile_h + tile.shape[0])
+            region[iy0 - y0:iy1 - y0, ix0 - x0:ix1 - x0] = \
+                tile[iy0 - ty * tile_h:iy1 - ty * tile_h, ix0 - tx * tile_w:ix1 - tx * tile_w]
+        return region
+    
+    def _get_coarse_tile(self, level, ty, tx):
+        """Aperçu de la tuile (ty, tx) agrandi depuis le niveau plus grossier le plus proche en mémoire.
+        
+        Le niveau le plus bas étant résident, un aperçu est presque toujours disponible.
+        """
+        tile_h, tile_w = self._get_tile_size(level)
+        img_h, img_w = self._get_image_size(level)
+        y0, x0 = ty * tile_h, tx * tile_w
+        h, w = min(tile_h, img_h - y0), min(tile_w, img_w - x0)
+        
+        for coarse_level in range(level + 1, len(self.pyramid)):
+            coarse_h, coarse_w = self._get_image_size(coarse_level)
+            fy, fx = coarse_h / img_h, coarse_w / img_w
+            cy0, cx0 = int(y0 * fy), int(x0 * fx)
+            cy1 = min(coarse_h, max(cy0 + 1, int(np.ceil((y0 + h) * fy))))
+            cx1 = min(coarse_w, max(cx0 + 1, int(np.ceil((x0 + w) * fx))))
+            region = self._get_cached_region(coarse_level, cx0, cy0, cx1, cy1)
+            if region is None or region.size == 0:
+                continue
+            
+            # Agrandissement au plus proche voisin vers la taille de la tuile
+            rows = np.clip(((np.arange(h) + y0 + 0.5) * fy).astype(int) - cy0, 0, region.shape[0] - 1)
+            cols = np.clip(((np.arange(w) + x0 + 0.5) * fx).astype(int) - cx0, 0, region.shape[1] - 1)
+            return region[rows][:, cols]
+        return None
+    
+    def _compute_display_max(self, arr):
+        """Valeur max d'affichage pour les images non uint8, estimée sur le niveau le plus bas arr.
+        
+        Une valeur commune à toutes les tuiles évite les écarts de luminosité entre tuiles.
+        Appelée depuis le chargeur de tuiles: l'échantillon (~1 Mpx) est pris dans un nombre
+        borné de chunks (THUMBNAIL_READ_MB), comme pour les vignettes.
+        """
+        axis_y, axis_x = self._spatial_axes(arr.shape)
+        chunk_bytes = int(np.prod(arr.chunks)) * arr.dtype.itemsize
+        max_chunks = max(1, THUMBNAIL_READ_MB * 1024 * 1024 // max(1, chunk_bytes))
+        per_axis = max(1, int(np.sqrt(max_chunks)))
+        
+        index = [slice(None)] * len(arr.shape)
+        for axis in (axis_y, axis_x):
+            index[axis] = self._thumbnail_sample_indices(arr.shape[axis], arr.chunks[axis], 1000, per_axis)
+        sample = np.asarray(arr.oindex[tuple(index)])
+        return float(sample.max()) if sample.size else 0.0
+    
+    @staticmethod
+    def _dtype_display_max(dtype):
+        """Max d'affichage provisoire: valeur max d'un type entier, 1 pour les flottants"""
+        if np.issubdtype(dtype, np.integer):
+            return float(np.iinfo(dtype).max)
+        return 1.0
+    
+    def _tile_to_image(self, tile, level, ty, tx, display_size=None):
+        """Convertit une tuile (ndarray) en image PIL RGB avec ses annotations.
         
-        # Normalise pour affichage
+        display_size: taille (w, h) à l'écran; la tuile est rééchantillonnée si elle diffère.
+        """
+        # Normalise pour affichage (étendue du type tant que le max commun n'est pas estimé)
         if tile.dtype != np.uint8:
-            if tile.max() > 0:
-                tile = (tile.astype(np.float32) / tile.max() * 255).astype(np.uint8)
-            else:
-                tile = tile.astype(np.uint8)
+            display_max = self.display_max or self._dtype_display_max(tile.dtype)
+            tile = (np.clip(tile.astype(np.float32) / display_max, 0, 1) * 255).astype(np.uint8)
         
         # Convertit en RGB si nécessaire
         if len(tile.shape) == 2:
@@ -1036,50 +3086,223 @@ class OMEZarrViewer:
         else:
             img = Image.fromarray(tile[:, :, :3], mode='RGB')
         
-        # Dessiner les annotations
+        # Superposer le calque d'annotations de la tuile (rastérisé une fois, puis en cache)
         if self.annotations and self.annotations_visible.get():
-            img = self._draw_annotations(img)
+            overlay = self._get_annotation_overlay(level, ty, tx, img.size)
+            if overlay is not None:
+                img = Image.alpha_composite(img.convert('RGBA'), Image.fromarray(overlay, mode='RGBA'))
+                img = img.convert('RGB')
+        
+        # Rééchantillonne à la taille écran (moyenne par zone en réduction, bilinéaire en agrandissement)
+        if display_size is not None and display_size != img.size:
+            shrink = display_size[0] < img.size[0]
+            img = img.resize(display_size, Image.Resampling.BOX if shrink else Image.Resampling.BILINEAR)
+        
+        return img
+    
+    def _acquire_photo(self, img):
+        """Retourne un PhotoImage affichant img, réutilisé depuis le pool si possible"""
+        pool = self.photo_pool.get(img.size)
+        if pool:
+            photo = pool.pop()
+            if not pool:
+                del self.photo_pool[img.size]
+            self.photo_pool_bytes -= img.size[0] * img.size[1] * 4
+            photo.paste(img)
+            return photo
+        return ImageTk.PhotoImage(img)
+    
+    def _release_photo(self, photo):
+        """Rend un PhotoImage au pool.
+        
+        Le pool est borné en mémoire (PHOTO_POOL_MB, 4 octets par pixel côté Tk): les tailles
+        les moins récemment rendues (zoom continu, bords de lame, lame précédente) sont
+        libérées en premier.
+        """
+        size = (photo.width(), photo.height())
+        self.photo_pool.setdefault(size, []).append(photo)
+        self.photo_pool.move_to_end(size)
+        self.photo_pool_bytes += size[0] * size[1] * 4
+        while self.photo_pool_bytes > PHOTO_POOL_MB * 1024 * 1024:
+            oldest, pool = next(iter(self.photo_pool.items()))
+            pool.pop()
+            if not pool:
+                del self.photo_pool[oldest]
+            self.photo_pool_bytes -= oldest[0] * oldest[1] * 4
+    
+    def _clear_tile_items(self):
+        """Supprime toutes les tuiles affichées du canvas"""
+        for item_id, photo, coarse in self.tile_items.values():
+            self._release_photo(photo)
+        self.tile_items.clear()
+        self.canvas.delete("tile")
+    
+    def _render(self):
+        """Rendu de l'image.
+        
+        Chaque tuile de la grille est un item image du canvas qui persiste d'un rendu à l'autre:
+        un déplacement translate les items existants (canvas.move) et ne crée de PhotoImage
+        que pour les tuiles nouvellement exposées.
+        """
+        if not self.pyramid:
+            return
+        
+        self.last_render_time = time.perf_counter()
+        
+        # Dimensions canvas
+        self.canvas_width = self.canvas.winfo_width()
+        self.canvas_height = self.canvas.winfo_height()
+        if self.canvas_width < 10:
+            self.canvas_width = 800
+            self.canvas_height = 600
+        
+        # Contraint la position
+        self._clamp_view()
         
-        # Affiche
-        self.photo = ImageTk.PhotoImage(img)
-        self.canvas.delete("all")
-        self.canvas.create_image(0, 0, anchor=tk.NW, image=self.photo)
+        # Nouvelle génération: les demandes de tuiles hors de cette vue deviennent obsolètes
+        self.tile_generation = self.tile_loader.new_generation()
+        self.missing_tiles = 0
+        
+        level = self.current_level
+        origin_x = round(self.view_x)
+        origin_y = round(self.view_y)
+        
+        # Tout changement autre qu'un déplacement invalide les items (niveau, zoom, annotations)
+        items_state = (self.zarr_path, level, self.zoom, self.annotations_visible.get(), self.annotation_version)
+        if items_state != self.tile_items_state:
+            self._clear_tile_items()
+            self.tile_items_state = items_state
+        elif (origin_x, origin_y) != self.tile_items_origin:
+            old_x, old_y = self.tile_items_origin
+            self.canvas.move("tile", old_x - origin_x, old_y - origin_y)
+        self.tile_items_origin = (origin_x, origin_y)
+        
+        # Région visible en pixels du niveau source
+        img_h, img_w = self._get_image_size(level)
+        tile_h, tile_w = self._get_tile_size(level)
+        sy, sx = self._get_level_scale(level)
+        read_x0 = max(0, int(origin_x / sx))
+        read_y0 = max(0, int(origin_y / sy))
+        read_x1 = min(int(np.ceil((origin_x + self.canvas_width) / sx)), img_w)
+        read_y1 = min(int(np.ceil((origin_y + self.canvas_height) / sy)), img_h)
+        tx0, tx1 = read_x0 // tile_w, max(read_x0, read_x1 - 1) // tile_w
+        ty0, ty1 = read_y0 // tile_h, max(read_y0, read_y1 - 1) // tile_h
+        center_x = (read_x0 + read_x1) / 2
+        center_y = (read_y0 + read_y1) / 2
+        
+        for ty in range(ty0, ty1 + 1):
+            for tx in range(tx0, tx1 + 1):
+                item = self.tile_items.get((ty, tx))
+                if item is not None and not item[2]:
+                    continue  # Tuile définitive déjà affichée
+                
+                tile = self._get_cached_tile(level, ty, tx)
+                
+                cache_key = (self.zarr_path, level, ty, tx)
+                if cache_key in self.prefetched_keys:
+                    if tile is not None:
+                        self.prefetch_stats["used"] += 1
+                    del self.prefetched_keys[cache_key]
+                
+                if tile is None:
+                    # Les tuiles proches du centre de la vue sont chargées en premier
+                    # (celles du niveau le plus bas arrivent avec l'aperçu en cours de lecture)
+                    if not (self.overview_pending and level == len(self.pyramid) - 1):
+                        dist = abs((tx + 0.5) * tile_w - center_x) + abs((ty + 0.5) * tile_h - center_y)
+                        self._request_grid_tile(level, ty, tx, priority=(PRIORITY_VISIBLE, dist))
+                    self.missing_tiles += 1
+                    if item is not None:
+                        continue  # Aperçu grossier déjà affiché en attendant
+                    # Aperçu immédiat depuis un niveau plus grossier déjà en mémoire
+                    tile = self._get_coarse_tile(level, ty, tx)
+                    if tile is None:
+                        continue
+                    coarse = True
+                else:
+                    coarse = False
+                
+                # Bords de la tuile à l'écran (arrondis communs aux tuiles voisines: pas de jointure)
+                x0 = round(tx * tile_w * sx)
+                y0 = round(ty * tile_h * sy)
+                x1 = round((tx * tile_w + tile.shape[1]) * sx)
+                y1 = round((ty * tile_h + tile.shape[0]) * sy)
+                if x1 <= x0 or y1 <= y0:
+                    continue
+                
+                img = self._tile_to_image(tile, level, ty, tx, display_size=(x1 - x0, y1 - y0))
+                photo = self._acquire_photo(img)
+                item_id = self.canvas.create_image(x0 - origin_x, y0 - origin_y,
+                                                   anchor=tk.NW, image=photo, tags=("tile",))
+                
+                if item is not None:
+                    # Remplace l'aperçu grossier par la tuile nette
+                    self.canvas.delete(item[0])
+                    self._release_photo(item[1])
+                self.tile_items[(ty, tx)] = (item_id, photo, coarse)
+        
+        # Libère les tuiles sorties de la vue (une tuile de marge pour les allers-retours)
+        for (ty, tx) in list(self.tile_items):
+            if not (ty0 - 1 <= ty <= ty1 + 1 and tx0 - 1 <= tx <= tx1 + 1):
+                item_id, photo, coarse = self.tile_items.pop((ty, tx))
+                self.canvas.delete(item_id)
+                self._release_photo(photo)
+        
+        # Précharge les tuiles probables du prochain rendu (après les tuiles visibles)
+        self._prefetch()
         
         # Update position label
         h, w = self._get_image_size(self.current_level)
-        self.pos_label.config(text=f"Vue: ({int(max(0, self.view_x))}, {int(max(0, self.view_y))}) | Image: {w}×{h}")
+        self.pos_label.config(text=f"Vue: ({int(max(0, self.view_x))}, {int(max(0, self.view_y))}) | "
+                                   f"Image: {w}×{h} | Zoom: {self.zoom:.1%}")
+        loading = f" | ⏳ {self.missing_tiles} tuile(s)" if self.missing_tiles else ""
+        self.cache_label.config(text=self.tile_cache.summary() + self._prefetch_summary() + loading)
+        
+        if self.load_started is not None:
+            self._record_first_frame()
+    
+    def _record_first_frame(self):
+        """Temps d'ouverture: premier rendu (aperçu), puis première image nette (plus aucune
+        tuile visible en attente), affichés dans la barre de statut"""
+        elapsed = (time.perf_counter() - self.load_started) * 1000
+        timings = self.load_timings
+        if self.tile_items or not self.missing_tiles:
+            timings.setdefault("first_frame", elapsed)  # Premier rendu montrant une image
+        if self.missing_tiles:
+            return
+        timings["sharp_frame"] = elapsed
+        self.load_started = None
+        name = Path(self.zarr_path).name
+        self._set_status(f"Chargé: {name} | image nette en {elapsed:.0f} ms "
+                         f"(métadonnées {timings['metadata']:.0f} ms, {timings['source']}; "
+                         f"premier rendu {timings['first_frame']:.0f} ms)")
     
     # =========================================================================
     # Événements
     # =========================================================================
     
     def _on_level_change(self, event=None):
-        old_level = self.current_level
+        """Sélection d'un niveau: affiche ce niveau à 1:1, centré sur le même point"""
         new_level = int(self.level_var.get())
         
-        if old_level != new_level and self.pyramid:
-            old_h, old_w = self._get_image_size(old_level)
-            new_h, new_w = self._get_image_size(new_level)
-            
-            # Centre de la vue actuelle
-            center_x = self.view_x + self.canvas_width / 2
-            center_y = self.view_y + self.canvas_height / 2
+        if self.pyramid:
+            # Centre de la vue actuelle (coordonnées niveau 0)
+            center_x = (self.view_x + self.canvas_width / 2) / self.zoom
+            center_y = (self.view_y + self.canvas_height / 2) / self.zoom
             
-            # Ratio
-            ratio_x = new_w / old_w
-            ratio_y = new_h / old_h
+            self._set_zoom(self._level_zoom(new_level))
             
             # Nouvelle position centrée
-            self.view_x = center_x * ratio_x - self.canvas_width / 2
-            self.view_y = center_y * ratio_y - self.canvas_height / 2
-            self.current_level = new_level
+            self.view_x = center_x * self.zoom - self.canvas_width / 2
+            self.view_y = center_y * self.zoom - self.canvas_height / 2
             
-            self._render()
+            self._request_render()
     
     def _on_drag_start(self, event):
         self.drag_start_x = event.x
         self.drag_start_y = event.y
         self.dragging = True
+        self.pan_velocity = (0.0, 0.0)
+        self.last_drag_time = event.time
         self.canvas.config(cursor="fleur")
     
     def _on_drag(self, event):
@@ -1090,10 +3313,19 @@ class OMEZarrViewer:
             self.view_y += dy
             self.drag_start_x = event.x
             self.drag_start_y = event.y
-            self._render()
+            
+            # Vitesse de déplacement lissée (px/s) pour le préchargement
+            dt = (event.time - self.last_drag_time) / 1000 if self.last_drag_time is not None else 0
+            self.last_drag_time = event.time
+            if dt > 0:
+                old_vx, old_vy = self.pan_velocity
+                self.pan_velocity = (0.7 * old_vx + 0.3 * dx / dt, 0.7 * old_vy + 0.3 * dy / dt)
+            
+            self._request_render()
     
     def _on_drag_end(self, event):
         self.dragging = False
+        self.pan_velocity = (0.0, 0.0)
         self.canvas.config(cursor="")
     
     def _on_scroll(self, event):
@@ -1108,147 +3340,285 @@ class OMEZarrViewer:
     def _on_scroll_down(self, event):
         self._zoom_out(event.x, event.y)
     
+    def _zoom_at(self, factor, mouse_x, mouse_y):
+        """Zoom continu d'un facteur, centré sur la position de la souris.
+        
+        Le niveau source est celui de résolution juste suffisante: la plupart des crans
+        réutilisent les tuiles déjà en cache du même niveau, rééchantillonnées.
+        """
+        if not self.pyramid:
+            return
+        
+        min_zoom, max_zoom = self._zoom_limits()
+        new_zoom = max(min_zoom, min(max_zoom, self.zoom * factor))
+        if abs(new_zoom - self.zoom) < 1e-9:
+            return
+        
+        # Point sous la souris (coordonnées niveau 0), conservé après le zoom
+        abs_x = (self.view_x + mouse_x) / self.zoom
+        abs_y = (self.view_y + mouse_y) / self.zoom
+        
+        self._set_zoom(new_zoom)
+        self.view_x = abs_x * self.zoom - mouse_x
+        self.view_y = abs_y * self.zoom - mouse_y
+        
+        self._request_render()
+    
     def _zoom_in(self, mouse_x, mouse_y):
-        """Zoom in = niveau de résolution plus élevé (plus de détails)"""
-        if self.current_level > 0:
-            abs_x = self.view_x + mouse_x
-            abs_y = self.view_y + mouse_y
-            
-            old_h, old_w = self._get_image_size(self.current_level)
-            new_level = self.current_level - 1
-            new_h, new_w = self._get_image_size(new_level)
-            
-            ratio_x = new_w / old_w
-            ratio_y = new_h / old_h
-            
-            self.view_x = abs_x * ratio_x - mouse_x
-            self.view_y = abs_y * ratio_y - mouse_y
-            self.current_level = new_level
-            self.level_var.set(str(new_level))
-            
-            self._render()
+        """Zoom in = agrandissement d'un cran (plus de détails)"""
+        self._zoom_at(ZOOM_STEP, mouse_x, mouse_y)
     
     def _zoom_out(self, mouse_x, mouse_y):
-        """Zoom out = niveau de résolution plus bas (moins de détails)"""
-        if self.current_level < len(self.pyramid) - 1:
-            abs_x = self.view_x + mouse_x
-            abs_y = self.view_y + mouse_y
-            
-            old_h, old_w = self._get_image_size(self.current_level)
-            new_level = self.current_level + 1
-            new_h, new_w = self._get_image_size(new_level)
-            
-            ratio_x = new_w / old_w
-            ratio_y = new_h / old_h
-            
-            self.view_x = abs_x * ratio_x - mouse_x
-            self.view_y = abs_y * ratio_y - mouse_y
-            self.current_level = new_level
-            self.level_var.set(str(new_level))
-            
-            self._render()
+        """Zoom out = réduction d'un cran (moins de détails)"""
+        self._zoom_at(1 / ZOOM_STEP, mouse_x, mouse_y)
     
     def _on_resize(self, event):
         if self.pyramid:
-            self._render()
+            self._request_render()
     
     def _on_mouse_move(self, event):
         """Affiche les coordonnées sous le curseur"""
+        self.mouse_x = event.x
+        self.mouse_y = event.y
         if self.pyramid:
-            # Coordonnées dans l'image au niveau courant
-            img_x = int(self.view_x + event.x)
-            img_y = int(self.view_y + event.y)
-            
             # Coordonnées au niveau 0 (pleine résolution)
-            h0, w0 = self._get_image_size(0)
-            h_curr, w_curr = self._get_image_size(self.current_level)
-            
-            x0 = int(img_x * w0 / w_curr)
-            y0 = int(img_y * h0 / h_curr)
+            x0 = int((self.view_x + event.x) / self.zoom)
+            y0 = int((self.view_y + event.y) / self.zoom)
             
             self._set_status(f"Position: ({x0}, {y0}) @ niveau 0 | Niveau actuel: {self.current_level}")
     
     def _toggle_annotations(self):
         """Bascule la visibilité des annotations"""
         self.annotations_visible.set(not self.annotations_visible.get())
-        self._render()
+        self._request_render()
     
     def _load_annotations(self):
-        """Charge les annotations GeoJSON depuis le dossier zarr, ZIP ou les attrs"""
-        self.annotations = []
+        """Lance le chargement des annotations GeoJSON (dossier zarr, ZIP ou attrs) en arrière-plan.
+        
+        Les fichiers sont lus en flux et compilés par lots: l'image est consultable tout de suite
+        et les annotations apparaissent au fil de la lecture. Un chargement en cours est abandonné
+        à l'ouverture d'une autre lame.
+        """
+        self.annotations = CompiledAnnotations.compile([], None)
         self.annotation_levels = {}
+        self.annotation_index = None
+        self._cancel_annotation_lod()
+        self.annotation_lod = {}
+        self.annotation_heatmaps = {}
+        self.annotation_version += 1
+        self.annotation_load_id += 1
+        self.annot_count_label.config(text="")
         
         if not self.zarr_path:
-            self.annot_count_label.config(text="")
             return
         
-        zarr_path = Path(self.zarr_path)
-        is_zip = zarr_path.is_file() and zarr_path.suffix == '.zip'
-        
-        if is_zip:
-            # Chercher les annotations dans le ZIP
-            import zipfile
+        thread = threading.Thread(target=self._annotation_loader,
+                                  args=(self.annotation_load_id, self.zarr_path, self.zarr_store), daemon=True)
+        thread.start()
+    
+    def _annotation_sources(self, zarr_path, zarr_store):
+        """Liste des sources d'annotations: [(nom, signature, ouvreur de flux texte)].
+        
+        Fichiers du ZIP ou du dossier zarr, puis attrs zarr. La signature (taille, date, CRC ou
+        empreinte rapide) identifie le contenu sans le lire en entier (clé du sidecar compilé).
+        """
+        sources = []
+        path = Path(zarr_path)
+        if path.is_file() and path.suffix == '.zip':
+            # Entrées d'annotations de l'index partagé de l'archive
             try:
-                with zipfile.ZipFile(self.zarr_path, 'r') as zf:
-                    for name in zf.namelist():
-                        if name.endswith('.geojson') or (name.endswith('.json') and 'annot' in name.lower()):
-                            try:
-                                with zf.open(name) as f:
-                                    data = json.load(f)
-                                if data.get("type") == "FeatureCollection":
-                                    self.annotations.extend(data.get("features", []))
-                                    props = data.get("properties", {})
-                                    if "annotation_levels" in props:
-                                        for level in props["annotation_levels"]:
-                                            self.annotation_levels[level["id"]] = level
-                            except Exception as e:
-                                print(f"Erreur lecture annotation {name} dans ZIP: {e}")
+                zip_index = _get_zip_index(zarr_path)
+                for info in zip_index.annotation_entries:
+                    sources.append((info.filename, f"{info.filename}:{info.file_size}:{info.CRC}",
+                                    lambda name=info.filename: zip_index.open_text(name)))
             except Exception as e:
                 print(f"Erreur ouverture ZIP pour annotations: {e}")
         else:
             # Méthode 1: Chercher un fichier .geojson dans le dossier zarr
-            geojson_files = list(zarr_path.glob("*.geojson")) + list(zarr_path.glob("*.json"))
-            
-            for gj_file in geojson_files:
+            for gj_file in list(path.glob("*.geojson")) + list(path.glob("*.json")):
+                if gj_file.name in _ZARR_METADATA_NAMES:
+                    continue  # Métadonnées zarr (zarr.json d'un zarr v3), pas des annotations
                 try:
-                    with open(gj_file, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if data.get("type") == "FeatureCollection":
-                        self.annotations.extend(data.get("features", []))
-                        props = data.get("properties", {})
-                        if "annotation_levels" in props:
-                            for level in props["annotation_levels"]:
-                                self.annotation_levels[level["id"]] = level
-                except Exception as e:
-                    print(f"Erreur chargement {gj_file}: {e}")
+                    st = gj_file.stat()
+                    signature = f"{gj_file.name}:{st.st_size}:{st.st_mtime_ns}:{_quick_file_hash(gj_file)}"
+                except OSError as e:
+                    print(f"Erreur lecture {gj_file}: {e}")
+                    continue
+                sources.append((str(gj_file), signature,
+                                lambda gj_file=gj_file: open(gj_file, 'r', encoding='utf-8')))
         
         # Méthode 2: Chercher dans les attributs zarr (fonctionne pour ZIP et dossier)
         try:
-            if self.zarr_store and 'annotations' in self.zarr_store.attrs:
-                data = self.zarr_store.attrs['annotations']
-                if isinstance(data, str):
-                    data = json.loads(data)
-                if isinstance(data, dict) and data.get("type") == "FeatureCollection":
-                    self.annotations.extend(data.get("features", []))
-                    props = data.get("properties", {})
-                    if "annotation_levels" in props:
-                        for level in props["annotation_levels"]:
-                            self.annotation_levels[level["id"]] = level
+            if zarr_store is not None and 'annotations' in zarr_store.attrs:
+                data = zarr_store.attrs['annotations']
+                if not isinstance(data, str):
+                    data = json.dumps(data)
+                signature = f"attrs:{hashlib.sha1(data.encode('utf-8')).hexdigest()}"
+                sources.append(("attrs", signature, lambda data=data: io.StringIO(data)))
         except Exception as e:
             print(f"Erreur chargement attrs: {e}")
+        return sources
+    
+    @staticmethod
+    def _annotation_sidecar_path(zarr_path, sources):
+        """Dossier du sidecar compilé: "<empreinte de la lame>-<empreinte des sources et du format>".
+        
+        Le préfixe commun aux sidecars d'une même lame permet de retrouver les versions périmées.
+        """
+        slide = hashlib.sha1(str(Path(zarr_path).resolve()).encode('utf-8')).hexdigest()[:16]
+        key = "|".join([f"v{ANNOTATION_SIDECAR_VERSION}"] + [signature for _, signature, _ in sources])
+        return CACHE_DIR / "annotations" / f"{slide}-{hashlib.sha1(key.encode('utf-8')).hexdigest()}"
+    
+    @staticmethod
+    def _remove_stale_sidecars(sidecar):
+        """Supprime les autres sidecars de la même lame (sources modifiées ou format précédent)"""
+        slide = sidecar.name.split("-")[0]
+        for directory in sidecar.parent.glob(f"{slide}-*"):
+            if directory != sidecar and "." not in directory.name:  # Pas les écritures en cours (.tmp)
+                shutil.rmtree(directory, ignore_errors=True)
+    
+    def _annotation_loader(self, load_id, zarr_path, zarr_store):
+        """Thread de chargement: lecture en flux, compilation par lots, publication périodique"""
+        levels = {}
+        key_ids = {}
+        compiled = CompiledAnnotations.compile([], None)
+        batch = []
+        batch_size = ANNOTATION_BATCH_MIN
+        last_publish = 0.0
+        publish_interval = ANNOTATION_PUBLISH_INTERVAL
+        
+        def color_of(feature):
+            return self._get_annotation_color(feature, levels)
+        
+        def flush():
+            nonlocal compiled, batch
+            compiled = CompiledAnnotations.concatenate(
+                [compiled, CompiledAnnotations.compile(batch, color_of, key_ids)])
+            batch = []
+        
+        sources = self._annotation_sources(zarr_path, zarr_store)
+        if not sources:
+            return
+        
+        # Sidecar à jour: tableaux compilés relus en mémoire mappée, sans analyser le GeoJSON
+        sidecar = self._annotation_sidecar_path(zarr_path, sources)
+        if (sidecar / "meta.json").exists():
+            try:
+                compiled, meta = CompiledAnnotations.load(sidecar)
+                levels = {level["id"]: level for level in meta.get("annotation_levels", [])}
+                index = AnnotationIndex(compiled.bboxes) if len(compiled) else None
+                self.root.after(0, self._on_annotations_loaded, load_id, compiled, index, levels, True)
+                return
+            except Exception as e:
+                print(f"Sidecar d'annotations illisible {sidecar}: {e}")
+        
+        def publish(done):
+            # Intervalle doublé: les reconstructions (index, LOD, cartes de densité) coûtent au
+            # total de l'ordre d'une reconstruction finale, quelle que soit la durée du chargement
+            nonlocal last_publish, publish_interval
+            index = AnnotationIndex(compiled.bboxes) if len(compiled) else None
+            self.root.after(0, self._on_annotations_loaded, load_id, compiled, index, dict(levels), done)
+            if last_publish:
+                publish_interval *= 2
+            last_publish = time.monotonic()
+        
+        for name, _, open_stream in sources:
+            if load_id != self.annotation_load_id:
+                return
+            top_level = {}
+            levels_before = len(levels)
+            if batch:
+                flush()
+            compiled_before = compiled  # Retour arrière si la source n'est pas une FeatureCollection
+            try:
+                with open_stream() as stream:
+                    for feature in _iter_geojson_features(stream, top_level):
+                        if top_level.get("type", "FeatureCollection") != "FeatureCollection":
+                            break
+                        if not isinstance(feature, dict):
+                            continue
+                        batch.append(feature)
+                        if len(batch) >= batch_size:
+                            if load_id != self.annotation_load_id:
+                                return  # Autre lame ouverte: abandon
+                            flush()
+                            batch_size = min(batch_size * 2, ANNOTATION_BATCH_MAX)
+                            if time.monotonic() - last_publish >= publish_interval:
+                                publish(done=False)
+            except Exception as e:
+                print(f"Erreur chargement annotations {name}: {e}")
+            
+            # Comme json.load + test du type: autre objet JSON (type éventuellement déclaré après
+            # les features) ignoré, sans niveaux d'annotation
+            if top_level.get("type") != "FeatureCollection":
+                batch = []
+                compiled = compiled_before
+                continue
+            
+            # Niveaux d'annotation (couleurs), éventuellement déclarés après les features
+            props = top_level.get("properties") or {}
+            if isinstance(props, dict):
+                for level in props.get("annotation_levels", []):
+                    try:
+                        levels[level["id"]] = level
+                    except (KeyError, TypeError):
+                        continue
+            if len(levels) != levels_before and len(compiled):
+                compiled = compiled.recolored(color_of)
+        
+        if load_id != self.annotation_load_id:
+            return
+        flush()
+        publish(done=True)
+        
+        # Sidecar pour les ouvertures suivantes
+        try:
+            compiled.save(sidecar, {"version": ANNOTATION_SIDECAR_VERSION,
+                                    "sources": [signature for _, signature, _ in sources],
+                                    "annotation_levels": list(levels.values())})
+        except OSError as e:
+            print(f"Erreur écriture sidecar d'annotations {sidecar}: {e}")
+            return
+        self._remove_stale_sidecars(sidecar)
+    
+    def _on_annotations_loaded(self, load_id, compiled, index, levels, done):
+        """Installe un état (partiel ou final) des annotations chargées (thread UI)"""
+        if load_id != self.annotation_load_id:
+            return  # Chargement d'une lame déjà quittée
+        self.annotations = compiled
+        self.annotation_index = index
+        self.annotation_levels = levels
+        self._cancel_annotation_lod()
+        self.annotation_lod = {}
+        self.annotation_heatmaps = {}
+        self.annotation_version += 1
         
         # Mise à jour UI
-        count = len(self.annotations)
-        if count > 0:
-            self.annot_count_label.config(text=f"({count})")
-            self._set_status(f"Chargé {count} annotation(s)")
+        count = len(compiled)
+        if done:
+            self.annot_count_label.config(text=f"({count})" if count else "")
+            if count:
+                self._set_status(f"Chargé {count} annotation(s)")
+            self._record_annotation_count(Path(self.zarr_path), count)
         else:
-            self.annot_count_label.config(text="")
+            self.annot_count_label.config(text=f"({count}…)")
+        self._request_render()
+    
+    def _record_annotation_count(self, zarr_path, count):
+        """Enregistre le nombre d'annotations d'une lame dans le catalogue et la liste"""
+        try:
+            self.catalog.update(zarr_path, annotations=count)
+        except sqlite3.Error as e:
+            print(f"Erreur mise à jour du catalogue {self.catalog.path}: {e}")
+        if zarr_path in self.slide_info:
+            self.slide_info[zarr_path]["annotations"] = count
+            self._update_tree_info(zarr_path)
     
-    def _get_annotation_color(self, feature):
-        """Retourne la couleur pour une annotation"""
+    def _get_annotation_color(self, feature, levels=None):
+        """Retourne la couleur pour une annotation (levels: niveaux d'annotation, par défaut ceux chargés)"""
         props = feature.get("properties", {})
+        if levels is None:
+            levels = self.annotation_levels
         
         # Couleur explicite dans les propriétés
         if "color" in props:
@@ -1256,8 +3626,8 @@ class OMEZarrViewer:
         
         # Couleur basée sur le niveau d'annotation
         level_id = props.get("level_id")
-        if level_id and level_id in self.annotation_levels:
-            level = self.annotation_levels[level_id]
+        if level_id and level_id in levels:
+            level = levels[level_id]
             # Chercher la couleur de la classe
             class_name = props.get("class_name", "")
             for cls in level.get("classes", []):
@@ -1280,107 +3650,248 @@ class OMEZarrViewer:
         
         return "#FF5722"  # Orange par défaut
     
-    def _draw_annotations(self, img):
-        """Dessine les annotations sur l'image PIL"""
-        if not self.annotations or not self.annotations_visible.get():
-            return img
+    def _get_annotation_overlay(self, level, ty, tx, size):
+        """Calque RGBA (ndarray) des annotations d'une tuile, None si elle n'en contient aucune.
+        
+        Le calque ne dépend que du jeu d'annotations (annotation_version) et de la tuile: il est
+        réutilisé tel quel lors des changements de zoom, du remplacement des tuiles grossières et
+        du réaffichage après masquage des annotations.
+        """
+        key = (self.zarr_path, level, ty, tx, self.annotation_version)
+        overlay = self.overlay_cache.get(key)
+        if overlay is None:
+            tile_h, tile_w = self._get_tile_size(level)
+            overlay = self._draw_annotations(level, tx * tile_w, ty * tile_h, size)
+            if overlay is None:
+                # Tuile sans annotation (mémorisé aussi), de taille non nulle pour être évincée
+                overlay = np.zeros(EMPTY_OVERLAY_BYTES, dtype=np.uint8)
+            self.overlay_cache.put(key, overlay)
+        return overlay if overlay.ndim == 3 else None
+    
+    def _draw_annotations(self, level, origin_x, origin_y, size):
+        """Rastérise les annotations d'une tuile dans un calque RGBA (ndarray h×w×4).
         
-        # Créer un calque avec transparence
-        overlay = Image.new('RGBA', img.size, (0, 0, 0, 0))
-        draw = ImageDraw.Draw(overlay)
+        origin_x, origin_y: position du coin haut-gauche de la tuile, en pixels du niveau.
+        size: (largeur, hauteur) de la tuile. Retourne None si aucune annotation ne la touche.
+        """
+        if not self.annotations:
+            return None
         
-        # Facteur d'échelle pour convertir coordonnées niveau 0 -> niveau courant
+        # Facteur d'échelle pour convertir coordonnées niveau 0 -> niveau de la tuile
         h0, w0 = self._get_image_size(0)
-        h_curr, w_curr = self._get_image_size(self.current_level)
+        h_curr, w_curr = self._get_image_size(level)
         scale = w_curr / w0
+        width, height = size
+        
+        # Ne parcourir que les annotations dont la boîte touche la tuile (marge: rayon des points, traits)
+        margin = 10
+        visible = self.annotation_index.query((origin_x - margin) / scale, (origin_y - margin) / scale,
+                                              (origin_x + width + margin) / scale,
+                                              (origin_y + height + margin) / scale)
+        if len(visible) == 0:
+            return None
         
-        for feature in self.annotations:
-            geom = feature.get("geometry", {})
-            geom_type = geom.get("type", "")
-            coords = geom.get("coordinates", [])
-            
-            color_hex = self._get_annotation_color(feature)
-            try:
-                r = int(color_hex[1:3], 16)
-                g = int(color_hex[3:5], 16)
-                b = int(color_hex[5:7], 16)
-            except:
-                r, g, b = 255, 87, 34
-            
-            if geom_type == "Polygon" and coords:
-                self._draw_polygon(draw, coords[0], scale, (r, g, b))
-            elif geom_type == "MultiPolygon" and coords:
-                for polygon in coords:
-                    if polygon:
-                        self._draw_polygon(draw, polygon[0], scale, (r, g, b))
-            elif geom_type == "Point" and coords:
-                self._draw_point(draw, coords, scale, (r, g, b))
-            elif geom_type == "LineString" and coords:
-                self._draw_line(draw, coords, scale, (r, g, b))
-        
-        # Fusionner avec l'image originale
-        if img.mode != 'RGBA':
-            img = img.convert('RGBA')
-        img = Image.alpha_composite(img, overlay)
-        return img.convert('RGB')
-    
-    def _draw_polygon(self, draw, coords, scale, color):
-        """Dessine un polygone"""
-        points = []
-        for x, y in coords:
-            # Convertir en coordonnées écran
-            px = x * scale - self.view_x
-            py = y * scale - self.view_y
-            points.append((px, py))
+        # Vue dézoomée sur un grand jeu: les petites annotations sont agrégées en carte de densité
+        layer = None
+        heatmap = self._get_annotation_heatmap(level)
+        if heatmap is not None:
+            grid, aggregated = heatmap
+            layer = self._crop_heatmap(grid, origin_x, origin_y, width, height)
+            visible = visible[~aggregated[visible]]
+            if len(visible) == 0:
+                return layer
+        
+        # Transformation vers le repère de la tuile: une seule multiplication-addition vectorisée
+        ann = self._get_annotation_lod(level)
+        points, offsets, part_features = ann.gather(visible)
+        points = points * np.float32(scale) - np.array([origin_x, origin_y], dtype=np.float32)
+        part_types = ann.geom_types[part_features]
+        
+        # Créer un calque avec transparence; les annotations réduites à un pixel y sont écrites en bloc
+        dots = np.flatnonzero(part_types == CompiledAnnotations.DOT)
+        if len(dots):
+            if layer is None:
+                layer = np.zeros((height, width, 4), dtype=np.uint8)
+            xy = np.floor(points[offsets[dots]]).astype(np.int64)
+            inside = (xy[:, 0] >= 0) & (xy[:, 0] < width) & (xy[:, 1] >= 0) & (xy[:, 1] < height)
+            layer[xy[inside, 1], xy[inside, 0], :3] = ann.colors[ann.color_ids[part_features[dots[inside]]]]
+            layer[xy[inside, 1], xy[inside, 0], 3] = 200
+        if layer is not None:
+            overlay = Image.fromarray(layer, mode='RGBA')
+        else:
+            overlay = Image.new('RGBA', size, (0, 0, 0, 0))
+        draw = ImageDraw.Draw(overlay)
+        
+        # Les autres parties sont dessinées une à une
+        shapes = np.flatnonzero(part_types != CompiledAnnotations.DOT)
+        lo = np.minimum.reduceat(points, offsets[:-1], axis=0)[shapes].tolist()
+        hi = np.maximum.reduceat(points, offsets[:-1], axis=0)[shapes].tolist()
+        starts, stops = offsets[shapes].tolist(), offsets[shapes + 1].tolist()
+        geom_types = part_types[shapes].tolist()
+        colors = ann.colors[ann.color_ids[part_features[shapes]]].tolist()
+        
+        for j, geom_type in enumerate(geom_types):
+            (min_x, min_y), (max_x, max_y) = lo[j], hi[j]
+            part = points[starts[j]:stops[j]]
+            if geom_type == CompiledAnnotations.POLYGON:
+                if max_x < 0 or min_x > width or max_y < 0 or min_y > height:
+                    continue  # Hors tuile
+                self._draw_polygon(draw, part, colors[j])
+            elif geom_type == CompiledAnnotations.POINT:
+                if min_x < -10 or min_x > width + 10 or min_y < -10 or min_y > height + 10:
+                    continue
+                self._draw_point(draw, min_x, min_y, colors[j])
+            elif geom_type == CompiledAnnotations.LINE:
+                self._draw_line(draw, part, colors[j])
         
+        return np.asarray(overlay)
+    
+    def _get_annotation_lod(self, level):
+        """Annotations simplifiées pour un niveau (tolérance: un pixel du niveau), mises en cache.
+        
+        La simplification est calculée par le chargeur de tuiles: tant qu'elle n'est pas prête,
+        les annotations complètes sont retournées.
+        """
+        if level == 0:
+            return self.annotations
+        if level not in self.annotation_lod:
+            self.annotation_lod[level] = None  # En cours
+            annotations = self.annotations
+            tolerance = self._get_image_size(0)[1] / self._get_image_size(level)[1]
+            self.tile_loader.submit((self.zarr_path, "annotation_lod", level, self.annotation_version),
+                                    lambda: annotations.simplified(tolerance),
+                                    callback=self._on_annotation_lod_loaded,
+                                    priority=(PRIORITY_PREFETCH_PAN, -1))
+        lod = self.annotation_lod[level]
+        return lod if lod is not None else self.annotations
+    
+    def _on_annotation_lod_loaded(self, key, lod, error):
+        """Appelé depuis un thread de chargement quand un niveau simplifié est calculé"""
+        if error is not None:
+            print(f"Erreur simplification des annotations {key}: {error}")
+            return
+        self.root.after(0, self._set_annotation_lod, key, lod)
+    
+    def _set_annotation_lod(self, key, lod):
+        """Installe un niveau simplifié (thread Tk) s'il correspond encore au jeu d'annotations affiché"""
+        path, _, level, version = key
+        if path == self.zarr_path and version == self.annotation_version and level in self.annotation_lod:
+            self.annotation_lod[level] = lod
+    
+    def _cancel_annotation_lod(self):
+        """Annule les simplifications en attente du jeu d'annotations qui va être remplacé"""
+        for level, lod in self.annotation_lod.items():
+            if lod is None:
+                self.tile_loader.cancel((self.zarr_path, "annotation_lod", level, self.annotation_version))
+    
+    def _get_annotation_heatmap(self, level):
+        """Carte de densité d'un niveau, ou None si les annotations y sont dessinées une à une.
+        
+        Les annotations plus petites qu'une case (HEATMAP_BIN_PX pixels du niveau) sont comptées
+        dans la case de leur centre (boîte englobante), par couleur de classe: la couleur d'une case
+        est le mélange des classes pondéré par leur effectif, son opacité croît avec le log du nombre
+        d'annotations. Retourne (grille RGBA (gh, gw, 4) uint8, masque des annotations agrégées).
+        """
+        h0, w0 = self._get_image_size(0)
+        h_curr, w_curr = self._get_image_size(level)
+        downsample = w0 / w_curr
+        if downsample < HEATMAP_MIN_DOWNSAMPLE or len(self.annotations) < HEATMAP_MIN_FEATURES:
+            return None
+        if level in self.annotation_heatmaps:
+            return self.annotation_heatmaps[level]
+        
+        ann = self.annotations
+        bin_size = HEATMAP_BIN_PX * downsample  # Taille d'une case en unités du niveau 0
+        bb = ann.bboxes
+        aggregated = np.maximum(bb[:, 2] - bb[:, 0], bb[:, 3] - bb[:, 1]) < bin_size
+        
+        grid_h = -(-h_curr // HEATMAP_BIN_PX)
+        grid_w = -(-w_curr // HEATMAP_BIN_PX)
+        centers = (bb[aggregated, :2] + bb[aggregated, 2:]) / 2
+        by = np.clip((centers[:, 1] / bin_size).astype(np.int64), 0, grid_h - 1)
+        bx = np.clip((centers[:, 0] / bin_size).astype(np.int64), 0, grid_w - 1)
+        bins = by * grid_w + bx
+        
+        # Effectifs et somme des couleurs de classe par case (histogrammes pondérés)
+        n_bins = grid_h * grid_w
+        counts = np.bincount(bins, minlength=n_bins).astype(np.float32)
+        rgb = ann.colors[ann.color_ids[aggregated]].astype(np.float32)
+        grid = np.zeros((n_bins, 4), dtype=np.uint8)
+        filled = counts > 0
+        for c in range(3):
+            sums = np.bincount(bins, weights=rgb[:, c], minlength=n_bins)
+            grid[filled, c] = (sums[filled] / counts[filled]).astype(np.uint8)
+        if filled.any():
+            top = np.percentile(counts[filled], 99)
+            grid[filled, 3] = (60 + 160 * np.clip(np.log1p(counts[filled]) / np.log1p(top), 0, 1)).astype(np.uint8)
+        
+        heatmap = (grid.reshape(grid_h, grid_w, 4), aggregated)
+        self.annotation_heatmaps[level] = heatmap
+        return heatmap
+    
+    @staticmethod
+    def _crop_heatmap(grid, origin_x, origin_y, width, height):
+        """Extrait la partie de la grille couvrant une tuile, agrandie (bilinéaire) aux pixels du niveau"""
+        b = HEATMAP_BIN_PX
+        gx0, gy0 = origin_x // b, origin_y // b
+        gx1, gy1 = -(-(origin_x + width) // b), -(-(origin_y + height) // b)
+        cells = grid[gy0:gy1, gx0:gx1]
+        layer = np.zeros((height, width, 4), dtype=np.uint8)
+        if cells.size == 0 or not cells[..., 3].any():
+            return layer
+        # Agrandit en centrant chaque case, puis recadre sur la tuile
+        img = Image.fromarray(np.ascontiguousarray(cells), mode='RGBA')
+        img = img.resize((cells.shape[1] * b, cells.shape[0] * b), Image.Resampling.BILINEAR)
+        dx, dy = origin_x - gx0 * b, origin_y - gy0 * b
+        crop = np.asarray(img)[dy:dy + height, dx:dx + width]
+        layer[:crop.shape[0], :crop.shape[1]] = crop
+        return layer
+    
+    def _draw_polygon(self, draw, points, color):
+        """Dessine un polygone (points: ndarray (n, 2) dans le repère de la tuile)"""
         if len(points) < 3:
             return
         
-        # Vérifier si le polygone est visible
-        min_x = min(p[0] for p in points)
-        max_x = max(p[0] for p in points)
-        min_y = min(p[1] for p in points)
-        max_y = max(p[1] for p in points)
-        
-        if max_x < 0 or min_x > self.canvas_width or max_y < 0 or min_y > self.canvas_height:
-            return  # Hors écran
-        
         r, g, b = color
+        flat = points.ravel().tolist()
         # Remplissage semi-transparent
-        draw.polygon(points, fill=(r, g, b, 50), outline=(r, g, b, 200))
+        draw.polygon(flat, fill=(r, g, b, 50), outline=(r, g, b, 200))
         # Contour plus épais
-        for i in range(len(points)):
-            p1 = points[i]
-            p2 = points[(i + 1) % len(points)]
-            draw.line([p1, p2], fill=(r, g, b, 255), width=2)
+        draw.line(flat + flat[:2], fill=(r, g, b, 255), width=2)
     
-    def _draw_point(self, draw, coords, scale, color):
+    def _draw_point(self, draw, px, py, color):
         """Dessine un point"""
-        x, y = coords[0], coords[1] if len(coords) > 1 else coords[0]
-        px = x * scale - self.view_x
-        py = y * scale - self.view_y
-        
-        if px < -10 or px > self.canvas_width + 10 or py < -10 or py > self.canvas_height + 10:
-            return
-        
         r, g, b = color
         radius = 6
         draw.ellipse([px - radius, py - radius, px + radius, py + radius],
                      fill=(r, g, b, 200), outline=(255, 255, 255, 255))
     
-    def _draw_line(self, draw, coords, scale, color):
+    def _draw_line(self, draw, points, color):
         """Dessine une ligne"""
-        points = []
-        for x, y in coords:
-            px = x * scale - self.view_x
-            py = y * scale - self.view_y
-            points.append((px, py))
-        
         if len(points) < 2:
             return
         
         r, g, b = color
-        draw.line(points, fill=(r, g, b, 255), width=2)
+        draw.line(points.ravel().tolist(), fill=(r, g, b, 255), width=2)
+    
+    def _log_cache_stats(self):
+        """Affiche les statistiques détaillées du cache de tuiles dans la console"""
+        st = self.tile_cache.stats()
+        print(f"[cache] {self.zarr_path}: {st['entries']} tuiles, "
+              f"{st['bytes'] / 2**20:.1f}/{st['max_bytes'] / 2**20:.0f} Mo, "
+              f"hits={st['hits']} misses={st['misses']} ({st['hit_rate']:.0%}), "
+              f"évictions={st['evictions']}")
+        for level, nbytes in st['level_bytes'].items():
+            print(f"[cache]   niveau {level}: {nbytes / 2**20:.1f} Mo")
+        ov = self.overlay_cache.stats()
+        if ov['entries']:
+            print(f"[cache] calques d'annotations: {ov['entries']} tuiles, "
+                  f"{ov['bytes'] / 2**20:.1f}/{ov['max_bytes'] / 2**20:.0f} Mo, "
+                  f"hits={ov['hits']} ({ov['hit_rate']:.0%})")
+        pf = self.prefetch_stats
+        if pf["issued"]:
+            print(f"[cache] préchargement: {pf['issued']} demandées, {pf['loaded']} lues, "
+                  f"{pf['used']} affichées ({pf['used'] / max(1, pf['loaded']):.0%})")
     
     def _set_status(self, message):
         """Met à jour la barre de statut"""